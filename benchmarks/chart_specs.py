@@ -0,0 +1,57 @@
+"""
+Measure the size of chart specs without their data.
+Run with: python benchmarks/chart_specs.py
+"""
+import sys
+import os
+import json
+import time
+import altair as alt
+
+# Add the parent directory to the path to import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.charts as charts
+from data.data_loader import get_national_trends, get_state_data
+
+def maltreatment_chart(trends_df):
+    """The stacked maltreatment type chart from the Trends page."""
+    types_df = trends_df[["Year", "Neglect_Percent", "Physical_Abuse_Percent", "Sexual_Abuse_Percent"]].rename(
+        columns={"Neglect_Percent": "Neglect", "Physical_Abuse_Percent": "Physical Abuse", "Sexual_Abuse_Percent": "Sexual Abuse"}
+    )
+    types_df["Other"] = 100 - types_df.iloc[:, 1:].sum(axis=1)
+    return alt.Chart(types_df).transform_fold(
+        charts.MALTREATMENT_TYPES, as_=["Maltreatment_Type", "Percentage"]
+    ).mark_area().encode(
+        x=alt.X("Year:O", title="Year"),
+        y=alt.Y("Percentage:Q", title="Percentage", stack="normalize"),
+        color=charts.maltreatment_color("Maltreatment_Type", title="Maltreatment Type"),
+        tooltip=["Year", "Maltreatment_Type:N", "Percentage:Q"]
+    ).properties(title="x").interactive()
+
+def spec_bytes(chart):
+    """Bytes of the compact spec JSON with the inline datasets removed."""
+    spec = chart.to_dict()
+    spec.pop("datasets", None)
+    spec.pop("$schema", None)
+    return len(json.dumps(spec, separators=(",", ":")))
+
+if __name__ == "__main__":
+    trends_df = get_national_trends()
+    state_df = get_state_data()
+    builders = {
+        "line (default color)": lambda: charts.create_line_chart(trends_df, "Year", "Victims", "V"),
+        "line (red)": lambda: charts.create_line_chart(trends_df, "Year", "Fatalities", "F", color="#e74c3c"),
+        "bar": lambda: charts.create_bar_chart(state_df, "State", "Victims", "B", color="#2ecc71"),
+        "multi-line": lambda: charts.create_multi_line_chart(
+            trends_df, "Year", ["Victims", "Fatalities", "Victim_Rate"], "M", toggle=True, y_scale="normalized"
+        ),
+        "maltreatment stacked area": lambda: maltreatment_chart(trends_df),
+    }
+    print(f"{'chart':<28} {'spec bytes':>10} {'build (ms)':>10}")
+    for name, build in builders.items():
+        start = time.perf_counter()
+        for _ in range(20):
+            chart = build()
+        seconds = (time.perf_counter() - start) / 20
+        print(f"{name:<28} {spec_bytes(chart):>10,} {seconds * 1000:>10.2f}")
@@ -0,0 +1,54 @@
+"""
+Compare chart data transports for a county-by-year sized series.
+Run with: python benchmarks/chart_transport.py
+"""
+import sys
+import os
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+import altair as alt
+
+# Add the parent directory to the path to import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Streamlit reads .streamlit/config.toml, which enables static serving, from the working directory
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.charts as charts
+
+def county_series(counties=3000, years=20):
+    """Build a synthetic county-by-year table of report counts."""
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "County": np.repeat([f"County {i}" for i in range(counties)], years),
+        "Year": np.tile(np.arange(2003, 2003 + years), counties),
+        "Reports": rng.integers(0, 5000, counties * years)
+    })
+
+def measure(chart, transport, repeat=3):
+    """Return (spec bytes, data file bytes, best seconds) for one transport."""
+    best = float("inf")
+    for _ in range(repeat):
+        # A fresh directory each time so file writes are included in the timing
+        charts.STATIC_DATA_DIR = tempfile.mkdtemp()
+        start = time.perf_counter()
+        spec = charts.use_data_transport(chart, transport).to_json()
+        best = min(best, time.perf_counter() - start)
+    file_bytes = sum(
+        os.path.getsize(os.path.join(charts.STATIC_DATA_DIR, name))
+        for name in os.listdir(charts.STATIC_DATA_DIR)
+    )
+    return len(spec.encode("utf-8")), file_bytes, best
+
+if __name__ == "__main__":
+    # Streamlit lifts Altair's row limit too; inline mode would refuse this size otherwise
+    alt.data_transformers.disable_max_rows()
+    data = county_series()
+    # Every row is plotted; the default point budget would downsample the series to a few hundred points
+    chart = charts.create_line_chart(data, "Year", "Reports", "Reports by County", max_points=None)
+    print(f"{len(data):,} rows")
+    print(f"{'transport':<10} {'spec':>12} {'data file':>12} {'total':>12} {'time (ms)':>10}")
+    for transport in ["inline", "columnar", "csv"]:
+        spec_bytes, file_bytes, seconds = measure(chart, transport)
+        print(f"{transport:<10} {spec_bytes:>12,} {file_bytes:>12,} {spec_bytes + file_bytes:>12,} {seconds * 1000:>10.1f}")
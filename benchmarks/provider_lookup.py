@@ -0,0 +1,44 @@
+"""
+Time nearest and within-radius provider queries as the directory grows.
+Run with: python benchmarks/provider_lookup.py
+"""
+import sys
+import os
+import time
+import numpy as np
+
+# Add the parent directory to the path to import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.geo import PointIndex, haversine_km
+
+def synthetic_points(size, seed=0):
+    """Points clustered around random 'cities' in the continental US."""
+    rng = np.random.default_rng(seed)
+    cities = np.column_stack([rng.uniform(26, 48, 300), rng.uniform(-123, -71, 300)])
+    picks = cities[rng.integers(0, len(cities), size)]
+    return picks[:, 0] + rng.normal(0, 0.3, size), picks[:, 1] + rng.normal(0, 0.3, size)
+
+def best_ms(fn, queries):
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for lat, lon in queries:
+            fn(lat, lon)
+        best = min(best, (time.perf_counter() - start) / len(queries))
+    return best * 1000
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(1)
+    queries = list(zip(rng.uniform(30, 45, 200), rng.uniform(-120, -75, 200)))
+    print(f"{'providers':>10} {'nearest 10 (ms)':>16} {'within 50 km (ms)':>18} {'brute force (ms)':>17}")
+    for size in [1000, 10000, 50000]:
+        lats, lons = synthetic_points(size)
+        index = PointIndex(lats, lons)
+        # Spot-check against a full scan
+        for lat, lon in queries[:20]:
+            exact = np.sort(haversine_km(lat, lon, lats, lons))[:10]
+            assert np.allclose([d for _, d in index.nearest(lat, lon, 10)], exact)
+        print(f"{size:>10,} {best_ms(lambda a, b: index.nearest(a, b, 10), queries):>16.3f}"
+              f" {best_ms(lambda a, b: index.within(a, b, 50), queries):>18.3f}"
+              f" {best_ms(lambda a, b: np.argsort(haversine_km(a, b, lats, lons))[:10], queries[:20]):>17.3f}")
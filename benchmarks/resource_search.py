@@ -0,0 +1,62 @@
+"""
+Time resource search on a synthetic directory of local providers.
+Run with: python benchmarks/resource_search.py
+"""
+import sys
+import os
+import time
+import random
+
+# Add the parent directory to the path to import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.search import SearchIndex
+
+WORDS = """child children family families abuse neglect prevention support services hotline
+counseling advocacy center county office protective legal medical forensic interview therapy
+parenting education housing foster care youth crisis shelter referral assessment trauma""".split()
+
+def directory(size, seed=0, vocabulary=5000):
+    """
+    Build a synthetic provider directory with the resource fields.
+    Words follow a Zipf distribution with the domain words among the most
+    frequent and generated filler words in the tail, roughly like real text.
+    """
+    rng = random.Random(seed)
+    words = WORDS + [f"w{i}" for i in range(vocabulary)]
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    return [
+        {
+            "name": " ".join(rng.choices(words, weights, k=3)).title() + f" {i}",
+            "description": " ".join(rng.choices(words, weights, k=14)),
+            "type": rng.choice(["Prevention", "Policy", "Support", "Research"]),
+            "category": "Support Organizations"
+        }
+        for i in range(size)
+    ]
+
+def substring_filter(documents, query):
+    """The previous lowercase substring scan, for comparison."""
+    q = query.lower()
+    return [d for d in documents if q in d["name"].lower() or q in d["description"].lower()]
+
+def best_ms(fn, repeat=50):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+if __name__ == "__main__":
+    queries = ["hotline", "foster care", "forensic interv", "trauma counseling youth"]
+    for size in [1000, 10000]:
+        documents = directory(size)
+        start = time.perf_counter()
+        index = SearchIndex(documents)
+        build_ms = (time.perf_counter() - start) * 1000
+        print(f"{size:,} documents, index built in {build_ms:.0f} ms")
+        for query in queries:
+            hits = len(index.search(query))
+            print(f"  {query!r:<28} {hits:>6} hits  index {best_ms(lambda: index.search(query, limit=20)):7.3f} ms"
+                  f"  substring {best_ms(lambda: substring_filter(documents, query), 5):7.3f} ms")
@@ -0,0 +1,43 @@
+"""
+Time story generation with the data-grounded engine, enumerate every
+story for one state, and check the drawn maltreatment types follow the data.
+Run with: python benchmarks/story_engine.py
+"""
+import sys
+import os
+import time
+from collections import Counter
+
+# Add the parent directory to the path to import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.stories import StoryEngine, STATE_TYPE_COLUMNS
+from data.data_loader import get_state_data, get_national_trends, get_age_data, get_perpetrator_data
+
+def per_second(fn, count):
+    start = time.perf_counter()
+    fn(count)
+    return count / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    state_df = get_state_data()
+    engine = StoryEngine(state_df, get_national_trends(), get_age_data(), get_perpetrator_data())
+    count = 50000
+
+    grounded = per_second(lambda n: list(engine.stories(n, state="Texas", seed=1)), count)
+    print(f"{'data-grounded engine':<24} {grounded:>12,.0f} stories/s")
+
+    start = time.perf_counter()
+    every = list(engine.all_stories(state="Texas"))
+    print(f"{'every Texas story':<24} {len(every):>12,} stories in {time.perf_counter() - start:.2f} s, "
+          f"probabilities sum to {sum(p for p, _ in every):.6f}")
+
+    row = state_df[state_df["State"] == "Texas"].iloc[0]
+    total = sum(row[c] for c in STATE_TYPE_COLUMNS.values())
+    drawn = Counter(
+        story.split("experiencing ")[1].split(";")[0]
+        for story in engine.stories(count, state="Texas", seed=2)
+    )
+    print(f"\n{'Texas type':<16} {'data':>6} {'drawn':>6}")
+    for name, column in STATE_TYPE_COLUMNS.items():
+        print(f"{name:<16} {row[column] / total:>6.1%} {drawn[name] / count:>6.1%}")
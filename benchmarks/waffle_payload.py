@@ -0,0 +1,29 @@
+"""
+Compare waffle chart payloads for the HTML and SVG renderers.
+Run with: python benchmarks/waffle_payload.py
+"""
+import sys
+import os
+import time
+
+# Add the parent directory to the path to import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.charts import create_waffle_chart
+
+def measure(size, renderer, repeat=20):
+    """Return (payload bytes, best milliseconds) for a size x size waffle."""
+    best = float("inf")
+    for i in range(repeat):
+        # A different value every time so cached fragments are not the only thing timed
+        start = time.perf_counter()
+        html = create_waffle_chart(37 + i, 100, "Share", rows=size, cols=size, renderer=renderer)
+        best = min(best, time.perf_counter() - start)
+    return len(html.encode("utf-8")), best * 1000
+
+if __name__ == "__main__":
+    print(f"{'cells':>8} {'renderer':<8} {'bytes':>12} {'time (ms)':>10}")
+    for size in [10, 50, 100]:
+        for renderer in ["html", "svg"]:
+            payload, ms = measure(size, renderer)
+            print(f"{size * size:>8,} {renderer:<8} {payload:>12,} {ms:>10.3f}")
@@ -1,6 +1,14 @@
 import streamlit as st
 import pandas as pd
 import json
+import hashlib
+import os
+
+# Optional directory of local providers with coordinates, merged into get_resources
+PROVIDERS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "providers.csv")
+PROVIDER_COLUMNS = ["name", "description", "url", "type", "phone", "latitude", "longitude"]
+# Optional columns: two-letter or full state name, and languages separated by semicolons
+PROVIDER_OPTIONAL_COLUMNS = ["state", "languages"]
 
 # Cache all data loading functions to improve performance
 @st.cache_data(show_spinner=False)
@@ -180,8 +188,9 @@ def get_resources():
     """
     Load resource information.
     In a real app, this would load from a database or API.
+    Local providers from get_providers() are listed under "Local Providers".
     """
-    return {
+    resources = {
         "Prevention Programs": [
             {
                 "name": "Safe Care",
@@ -258,54 +267,53 @@ def get_resources():
             }
         ]
     }
+    
+    providers = get_providers()
+    if providers:
+        resources["Local Providers"] = providers
+    
+    return resources
 
 @st.cache_data(show_spinner=False)
-def get_quiz_questions():
+def get_providers():
     """
-    Load quiz questions.
-    In a real app, this would load from a database or API.
+    Load the local provider directory (e.g. child advocacy centers, CPS
+    offices and hotlines) from data/providers.csv when it exists.
+    The file needs the PROVIDER_COLUMNS and may add PROVIDER_OPTIONAL_COLUMNS;
+    rows without a name or coordinates are skipped and phone is optional.
+    Returns resource dicts, with languages as a list.
     """
-    return [
-        {
-            "question": "Neglect is the most common form of child maltreatment in the U.S.",
-            "options": ["True", "False"],
-            "answer": "True",
-            "explanation": "Neglect accounts for approximately 76% of substantiated cases of child maltreatment."
-        },
-        {
-            "question": "Which age group has the highest victimization rate in the U.S.?",
-            "options": ["Infants under 1", "Children 1-3", "School-aged children (6-12)", "Teenagers (13-17)"],
-            "answer": "Infants under 1",
-            "explanation": "Infants under 1 year old have the highest rate of victimization at 24.5 per 1,000 children."
-        },
-        {
-            "question": "Which demographic group faces the highest rates of substantiated maltreatment?",
-            "options": ["White children", "African American children", "Hispanic children", "American Indian/Alaska Native children"],
-            "answer": "American Indian/Alaska Native children",
-            "explanation": "American Indian/Alaska Native children have the highest victim rate at about 14.3 per 1,000 children."
-        },
-        {
-            "question": "What percentage of perpetrators of child maltreatment are parents?",
-            "options": ["Around 30%", "Around 50%", "Around 75%", "Around 90%"],
-            "answer": "Around 75%",
-            "explanation": "Approximately 77.5% of perpetrators are parents of the victim."
-        },
-        {
-            "question": "In the most recent data, child maltreatment fatalities have:",
-            "options": ["Increased significantly", "Remained mostly stable", "Decreased significantly", "Fluctuated with no clear trend"],
-            "answer": "Increased significantly",
-            "explanation": "Child fatalities due to maltreatment have increased by about 17% over the past decade."
-        },
-        {
-            "question": "Which is NOT typically considered a form of child maltreatment in official statistics?",
-            "options": ["Physical abuse", "Emotional abuse", "Academic neglect", "Medical neglect"],
-            "answer": "Academic neglect",
-            "explanation": "While educational neglect is tracked in some states, 'academic neglect' is not a standard category in federal maltreatment statistics."
-        },
-        {
-            "question": "What factor has the strongest correlation with increased risk of child maltreatment?",
-            "options": ["Geographic location", "Socioeconomic factors", "Parental age", "Family size"],
-            "answer": "Socioeconomic factors",
-            "explanation": "Economic stress, poverty, and lack of social supports are strongly correlated with increased risk of child maltreatment."
-        }
-    ]
\ No newline at end of file
+    if not os.path.exists(PROVIDERS_FILE):
+        return []
+    
+    df = pd.read_csv(PROVIDERS_FILE, dtype={"phone": str, "url": str, "state": str, "languages": str})
+    missing = set(PROVIDER_COLUMNS) - set(df.columns)
+    if missing:
+        raise ValueError(f"{PROVIDERS_FILE} is missing columns: {', '.join(sorted(missing))}")
+    
+    df = df.dropna(subset=["name", "latitude", "longitude"])
+    df[["description", "url", "type"]] = df[["description", "url", "type"]].fillna("")
+    columns = PROVIDER_COLUMNS + [c for c in PROVIDER_OPTIONAL_COLUMNS if c in df.columns]
+    providers = []
+    for row in df[columns].to_dict("records"):
+        for column in ["phone"] + PROVIDER_OPTIONAL_COLUMNS:
+            if column in row and pd.isna(row[column]):
+                del row[column]
+        if "languages" in row:
+            row["languages"] = [lang.strip() for lang in row["languages"].split(";") if lang.strip()]
+        providers.append(row)
+    return providers
+
+@st.cache_data(show_spinner=False)
+def get_resources_version():
+    """Content hash of get_resources(), used to key indexes built over it."""
+    payload = json.dumps(get_resources(), sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+@st.cache_data(show_spinner=False)
+def get_dataset_version():
+    """Content hash of the statistical datasets, used to key anything derived from them."""
+    digest = hashlib.sha1()
+    for df in [get_state_data(), get_national_trends(), get_disparities_data(), get_age_data(), get_perpetrator_data()]:
+        digest.update(df.to_json(orient="split").encode("utf-8"))
+    return digest.hexdigest()
@@ -0,0 +1,148 @@
+import math
+import random
+import threading
+import zlib
+from bisect import bisect_left, insort
+
+INITIAL_RATING = 1500.0
+# Starting ratings for questions nobody has answered yet, by difficulty tag
+DIFFICULTY_PRIORS = {"easy": 1350.0, "medium": 1500.0, "hard": 1650.0}
+ITEM_K = 16
+PLAYER_K = 32
+# Adaptive quizzes aim for questions the player answers correctly this often
+TARGET_SUCCESS = 0.7
+# Unrated questions are spread this far either side of their prior, so equal priors do not tie
+PRIOR_SPREAD = 50.0
+# Random offset of the target rating, so players of equal rating see different questions
+TARGET_SPREAD = 75.0
+
+def expected_success(player_rating, item_rating):
+    """Elo probability that a player answers an item correctly."""
+    return 1.0 / (1.0 + 10 ** ((item_rating - player_rating) / 400.0))
+
+def update_player(player_rating, item_rating, correct):
+    """The player's rating after one answer."""
+    return player_rating + PLAYER_K * (bool(correct) - expected_success(player_rating, item_rating))
+
+class ItemRatings:
+    """
+    Elo difficulty ratings of quiz questions, as a response log aggregator.
+    Every response moves the question's rating against the player rating
+    stored with it; a wrong answer makes the question harder. Ratings are
+    also kept as lists of (rating, id) pairs in sorted order, one per group
+    of questions (a question bank's tag combinations), so the question
+    nearest a target rating among some groups is found by bisecting each
+    group rather than by a pass over questions or response history. Moving
+    an item re-inserts its pair, a binary search plus a memmove of the list.
+    """
+
+    name = "ratings"
+
+    def __init__(self):
+        self.ratings = {}
+        self.learned = set()
+        self._priors = {}
+        self._bank = None
+        self._groups = {}
+        self._sorted = {}
+        self._lock = threading.Lock()
+
+    def _set(self, question_id, rating):
+        items = self._sorted.setdefault(self._groups.get(question_id), [])
+        old = self.ratings.get(question_id)
+        if old is not None:
+            del items[bisect_left(items, (old, question_id))]
+        self.ratings[question_id] = rating
+        insort(items, (rating, question_id))
+
+    def _regroup(self, question_id, group):
+        rating = self.ratings.get(question_id)
+        if rating is not None:
+            items = self._sorted[self._groups.get(question_id)]
+            del items[bisect_left(items, (rating, question_id))]
+        self._groups[question_id] = group
+        if rating is not None:
+            insort(self._sorted.setdefault(group, []), (rating, question_id))
+
+    def register(self, priors, groups=None):
+        """
+        Add questions, a dict of id to starting rating, that are not rated
+        yet, and move questions to the groups given as a dict of id to group.
+        Questions without a group are in the None group.
+        """
+        with self._lock:
+            for question_id, group in (groups or {}).items():
+                if self._groups.get(question_id) != group:
+                    self._regroup(question_id, group)
+            self._priors.update(priors)
+            for question_id, rating in priors.items():
+                if question_id not in self.ratings:
+                    self._set(question_id, rating)
+
+    def register_bank(self, bank):
+        """
+        Register every question of a QuestionBank at its DIFFICULTY_PRIORS
+        rating, grouped by tag combination; does nothing for the bank
+        registered last. Questions of earlier banks keep their ratings but
+        move to the None group, so they are not offered for the bank's groups.
+        """
+        if bank is self._bank:
+            return
+        groups = dict.fromkeys(self._groups)
+        for key, positions in bank.combinations.items():
+            for position in positions:
+                groups[bank.ids[position]] = key
+        self.register({
+            question_id: DIFFICULTY_PRIORS.get(bank.tags(question_id)["difficulty"], INITIAL_RATING)
+            + PRIOR_SPREAD * (zlib.crc32(question_id.encode("utf-8")) / 0x7FFFFFFF - 1.0)
+            for question_id in bank.ids
+        }, groups)
+        self._bank = bank
+
+    def update(self, record):
+        question_id = record["question"]
+        player_rating = record.get("rating", INITIAL_RATING)
+        with self._lock:
+            item_rating = self.ratings.get(question_id, self._priors.get(question_id, INITIAL_RATING))
+            change = ITEM_K * (expected_success(player_rating, item_rating) - bool(record["correct"]))
+            self._set(question_id, item_rating + change)
+            self.learned.add(question_id)
+
+    def state(self):
+        with self._lock:
+            return {question_id: self.ratings[question_id] for question_id in self.learned}
+
+    def restore(self, state):
+        with self._lock:
+            for question_id, rating in state.items():
+                self._set(question_id, rating)
+                self.learned.add(question_id)
+
+    def rating(self, question_id):
+        with self._lock:
+            return self.ratings.get(question_id, INITIAL_RATING)
+
+    def next_question(self, player_rating, exclude=(), groups=None, target=TARGET_SUCCESS,
+                      spread=TARGET_SPREAD, rng=random):
+        """
+        Id of the question whose rating is closest to the one a player of
+        player_rating answers correctly with probability target, give or
+        take spread, among the given groups (all if None) and skipping ids
+        in exclude. Each group costs a bisection plus a step per excluded
+        neighbour. Returns None if no question is left.
+        """
+        goal = player_rating + 400.0 * math.log10(1.0 / target - 1.0) + rng.uniform(-spread, spread)
+        best, best_distance = None, math.inf
+        with self._lock:
+            lists = self._sorted.values() if groups is None else [self._sorted[g] for g in groups if g in self._sorted]
+            for items in lists:
+                right = bisect_left(items, (goal, ""))
+                left = right - 1
+                while left >= 0 and items[left][1] in exclude:
+                    left -= 1
+                while right < len(items) and items[right][1] in exclude:
+                    right += 1
+                for index in (left, right):
+                    if 0 <= index < len(items) and abs(items[index][0] - goal) < best_distance:
+                        best, best_distance = items[index][1], abs(items[index][0] - goal)
+        return best
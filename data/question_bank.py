@@ -0,0 +1,222 @@
+import streamlit as st
+import json
+import os
+import glob
+import random
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
+from data.data_loader import (
+    get_state_data, get_national_trends, get_age_data,
+    get_disparities_data, get_perpetrator_data, get_dataset_version
+)
+from data.question_generator import generate_questions, GENERATOR_VERSION
+
+QUIZ_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "quiz")
+QUESTIONS_FILE = os.path.join(QUIZ_DIR, "questions.jsonl")
+EXPLANATIONS_FILE = os.path.join(QUIZ_DIR, "explanations.jsonl")
+# Questions generated from the datasets, one file pair per dataset version
+GENERATED_DIR = os.path.join(QUIZ_DIR, "generated")
+
+# Every question carries one value for each tag
+QUESTION_TAGS = ("topic", "difficulty", "source")
+DIFFICULTIES = ["easy", "medium", "hard"]
+
+def _line_offsets(path):
+    """Byte offset of every line in a file, found without parsing the lines."""
+    offsets = array("q")
+    with open(path, "rb") as f:
+        position = 0
+        for line in f:
+            if line.strip():
+                offsets.append(position)
+            position += len(line)
+    return offsets
+
+def write_question_files(questions, questions_path, explanations_path):
+    """
+    Write question dicts as a question file and its explanations file.
+    Each file is written under a temporary name and renamed into place, so
+    a reader never sees a partial bank.
+    """
+    for path, records in (
+        (questions_path, [{k: v for k, v in q.items() if k != "explanation"} for q in questions]),
+        (explanations_path, [{"id": q["id"], "explanation": q.get("explanation", "")} for q in questions]),
+    ):
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+        os.replace(temp_path, path)
+
+class QuestionBank:
+    """
+    Quiz questions stored as JSONL files and read by byte offset.
+    Each question file is a JSON object per line with an id, question,
+    options, answer and the QUESTION_TAGS; a matching explanations file
+    holds {"id", "explanation"} lines in the same order. Building the bank
+    keeps only ids, tags and offsets in memory, with the positions of the
+    questions grouped by tag combination, so sampling reads just the
+    chosen questions and explanations are read only when shown.
+    """
+
+    def __init__(self, sources, cache_size=4096):
+        self.ids = []
+        self._files = []
+        self._file_starts = []
+        self._file_of = array("H")
+        self._offsets = array("q")
+        self._explanation_offsets = {}
+        self.combinations = {}
+        self._combination_keys = []
+        self._combination_index = {}
+        self._combination_of = array("H")
+
+        for questions_path, explanations_path in sources:
+            file_index = len(self._files)
+            self._files.append((questions_path, explanations_path))
+            self._file_starts.append(len(self.ids))
+            with open(questions_path, "rb") as f:
+                position = 0
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        key = tuple(record[tag] for tag in QUESTION_TAGS)
+                        if key not in self.combinations:
+                            self.combinations[key] = array("l")
+                            self._combination_index[key] = len(self._combination_keys)
+                            self._combination_keys.append(key)
+                        self._combination_of.append(self._combination_index[key])
+                        self.combinations[key].append(len(self.ids))
+                        self.ids.append(record["id"])
+                        self._file_of.append(file_index)
+                        self._offsets.append(position)
+                    position += len(line)
+
+        self.positions = {question_id: i for i, question_id in enumerate(self.ids)}
+        if len(self.positions) != len(self.ids):
+            raise ValueError("Question ids must be unique across the bank")
+        self._question = lru_cache(maxsize=cache_size)(self._read_question)
+        self._explanation = lru_cache(maxsize=cache_size)(self._read_explanation)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def tag_values(self, tag):
+        """Sorted values a tag takes across the bank."""
+        index = QUESTION_TAGS.index(tag)
+        return sorted({key[index] for key in self.combinations})
+
+    def tags(self, question_id):
+        """The QUESTION_TAGS values of a question, from the index."""
+        key = self._combination_keys[self._combination_of[self.positions[question_id]]]
+        return dict(zip(QUESTION_TAGS, key))
+
+    def combination_keys(self, filters=None):
+        """Tag combinations, as tuples in QUESTION_TAGS order, allowed by filters."""
+        filters = {tag: set(values) for tag, values in (filters or {}).items() if values}
+        return [
+            key for key in self.combinations
+            if all(key[QUESTION_TAGS.index(tag)] in values for tag, values in filters.items())
+        ]
+
+    def _matching(self, filters):
+        """Position lists of the tag combinations allowed by filters."""
+        return [self.combinations[key] for key in self.combination_keys(filters)]
+
+    def count(self, filters=None):
+        """Number of questions allowed by filters."""
+        return sum(len(positions) for positions in self._matching(filters))
+
+    def sample(self, k, filters=None, rng=random):
+        """
+        Ids of k distinct questions chosen uniformly among those allowed by
+        filters, a dict of tag to accepted values (empty accepts any). Draws
+        are ranks into the concatenated combination lists, so the cost is
+        O(k log c) for c matching combinations, whatever the bank size.
+        """
+        groups = self._matching(filters)
+        ends = []
+        total = 0
+        for positions in groups:
+            total += len(positions)
+            ends.append(total)
+        picks = []
+        for rank in rng.sample(range(total), min(k, total)):
+            group = bisect_right(ends, rank)
+            start = ends[group - 1] if group else 0
+            picks.append(self.ids[groups[group][rank - start]])
+        return picks
+
+    def _read_line(self, path, offset):
+        with open(path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def _read_question(self, question_id):
+        position = self.positions[question_id]
+        questions_path, _ = self._files[self._file_of[position]]
+        record = self._read_line(questions_path, self._offsets[position])
+        if record["id"] != question_id:
+            raise ValueError(f"{questions_path} changed since the question bank was built")
+        return record
+
+    def get(self, question_id):
+        """The question record for an id, without its explanation."""
+        return dict(self._question(question_id))
+
+    def _read_explanation(self, question_id):
+        position = self.positions[question_id]
+        file_index = self._file_of[position]
+        _, explanations_path = self._files[file_index]
+        if explanations_path is None:
+            return ""
+        if file_index not in self._explanation_offsets:
+            self._explanation_offsets[file_index] = _line_offsets(explanations_path)
+        # Explanation lines follow the question file's order
+        line = position - self._file_starts[file_index]
+        record = self._read_line(explanations_path, self._explanation_offsets[file_index][line])
+        if record["id"] != question_id:
+            raise ValueError(f"{explanations_path} is not in the same order as its question file")
+        return record["explanation"]
+
+    def explanation(self, question_id):
+        """The explanation for a question, read from disk on first use."""
+        return self._explanation(question_id)
+
+def _file_version(path):
+    stat = os.stat(path)
+    return (path, stat.st_mtime_ns, stat.st_size)
+
+def generated_source(dataset_version):
+    """
+    Question and explanation files generated from the current datasets,
+    written on first use for a dataset and generator version and reused
+    afterwards, including by later runs of the app. Files of other versions
+    are removed.
+    """
+    stem = os.path.join(GENERATED_DIR, f"questions-{dataset_version[:16]}-v{GENERATOR_VERSION}")
+    source = (f"{stem}.jsonl", f"{stem}.explanations.jsonl")
+    if not all(os.path.exists(path) for path in source):
+        os.makedirs(GENERATED_DIR, exist_ok=True)
+        questions = generate_questions(
+            get_state_data(), get_national_trends(), get_age_data(),
+            get_disparities_data(), get_perpetrator_data()
+        )
+        write_question_files(questions, *source)
+        for path in glob.glob(os.path.join(GENERATED_DIR, "questions-*.jsonl")):
+            if not path.startswith(stem):
+                os.remove(path)
+    return source
+
+@st.cache_resource(show_spinner=False)
+def _build_question_bank(versions, dataset_version):
+    return QuestionBank([(QUESTIONS_FILE, EXPLANATIONS_FILE), generated_source(dataset_version)])
+
+def get_question_bank():
+    """
+    The QuestionBank over the questions in data/quiz and those generated
+    from the current datasets. It is shared by every session and rebuilt
+    when the question files or the datasets change.
+    """
+    versions = (_file_version(QUESTIONS_FILE), _file_version(EXPLANATIONS_FILE))
+    return _build_question_bank(versions, get_dataset_version())
@@ -0,0 +1,223 @@
+import zlib
+import numpy as np
+
+# Bump when the generated questions change for the same data, so saved question files are rebuilt
+GENERATOR_VERSION = 2
+
+# Each metric: (column, phrase, value format, topic, source)
+STATE_METRICS = [
+    ("Victim_Rate", "victim rate", "{:.1f} per 1,000 children", "states", "state data"),
+    ("Victims", "number of victims", "{:,.0f} victims", "states", "state data"),
+    ("Fatalities", "number of fatalities", "{:,.0f} fatalities", "fatalities", "state data"),
+    ("Neglect_Percent", "share of cases involving neglect", "{:.0f}% of cases", "maltreatment types", "state data"),
+]
+TREND_METRICS = [
+    ("Victims", "the number of child maltreatment victims", "{:,.0f}", "trends", "national trends"),
+    ("Fatalities", "child maltreatment fatalities", "{:,.0f}", "fatalities", "national trends"),
+    ("Victim_Rate", "the national victim rate", "{:.1f} per 1,000 children", "trends", "national trends"),
+]
+MALTREATMENT_TYPE_COLUMNS = {
+    "Neglect_Percent": "Neglect",
+    "Physical_Abuse_Percent": "Physical abuse",
+    "Sexual_Abuse_Percent": "Sexual abuse",
+}
+
+# Pairs whose values differ by at least this fraction are easy, then medium; closer pairs are hard
+EASY_GAP = 0.5
+MEDIUM_GAP = 0.2
+# Every pair of rows makes a question, so pairs are sampled down to this many per metric
+MAX_PAIR_QUESTIONS = 30
+
+def _question(question_id, question, options, answer, explanation, topic, difficulty, source):
+    return {
+        "id": question_id,
+        "question": question,
+        "options": options,
+        "answer": answer,
+        "explanation": explanation,
+        "topic": topic,
+        "difficulty": difficulty,
+        "source": source,
+    }
+
+def _slug(text):
+    return "".join(c if c.isalnum() else "-" for c in str(text).lower()).strip("-")
+
+def extreme_questions(df, label_col, value_col, prompt, value_format, topic, source, kind,
+                      directions=("highest", "lowest")):
+    """
+    "Which {kind} had the highest/lowest ...?" questions. Easy versions take
+    distractors from the other end of the ranking, hard ones from next to
+    the answer. Ties for the top value produce no question.
+    """
+    ranked = df.sort_values(value_col, ascending=False, kind="mergesort")
+    labels = ranked[label_col].tolist()
+    values = ranked[value_col].to_numpy(dtype=float)
+    n = len(labels)
+    if n < 4:
+        return []
+
+    questions = []
+    for direction, order in (("highest", slice(None)), ("lowest", slice(None, None, -1))):
+        labels_d, values_d = labels[order], values[order]
+        if direction not in directions or values_d[0] == values_d[1]:
+            continue
+        for difficulty, ranks in (("easy", [n // 2, (3 * n) // 4, n - 1]), ("hard", [1, 2, 3])):
+            ranks = list(dict.fromkeys(min(r, n - 1) for r in ranks if r > 0))
+            if len(ranks) < 3:
+                continue
+            answer = labels_d[0]
+            options = sorted([answer] + [labels_d[r] for r in ranks])
+            questions.append(_question(
+                f"gen-{_slug(source)}-{_slug(value_col)}-{direction}-{difficulty}",
+                f"Which {kind} has the {direction} {prompt}?",
+                options,
+                answer,
+                f"{answer} has the {direction} {prompt} at {value_format.format(values_d[0])}, "
+                f"followed by {labels_d[1]} at {value_format.format(values_d[1])}.",
+                topic, difficulty, source
+            ))
+    return questions
+
+def _spread_sample(difficulty, k, rng):
+    """Sorted indexes of at most k items, split as evenly as possible across difficulty levels."""
+    if len(difficulty) <= k:
+        return np.arange(len(difficulty))
+    # Smallest levels first, so the share a level cannot fill passes to the larger ones
+    levels = sorted((np.flatnonzero(difficulty == level) for level in np.unique(difficulty)), key=len)
+    chosen = []
+    for n, indexes in enumerate(levels):
+        take = min(len(indexes), k // (len(levels) - n))
+        chosen.append(rng.choice(indexes, take, replace=False))
+        k -= take
+    return np.sort(np.concatenate(chosen))
+
+def pair_questions(df, label_col, value_col, prompt, value_format, topic, source,
+                   max_questions=MAX_PAIR_QUESTIONS):
+    """
+    True/false comparisons between pairs of rows with different values,
+    built from upper-triangle index arrays. Difficulty comes from the
+    relative gap between the two values; pairs alternate which side is
+    named first so true and false answers are balanced. At most
+    max_questions pairs are kept, spread over the difficulty levels and
+    drawn with a generator seeded by the metric, so the same data always
+    gives the same questions.
+    """
+    labels = df[label_col].to_numpy()
+    values = df[value_col].to_numpy(dtype=float)
+    i, j = np.triu_indices(len(values), k=1)
+    keep = values[i] != values[j]
+    i, j = i[keep], j[keep]
+
+    # Alternate order so half the statements are true
+    swap = np.arange(len(i)) % 2 == 1
+    first = np.where(swap, j, i)
+    second = np.where(swap, i, j)
+    truth = values[first] > values[second]
+    gap = np.abs(values[first] - values[second]) / np.maximum(np.maximum(values[first], values[second]), 1e-9)
+    difficulty = np.where(gap >= EASY_GAP, "easy", np.where(gap >= MEDIUM_GAP, "medium", "hard"))
+
+    rng = np.random.default_rng(zlib.crc32(f"{source}|{value_col}".encode("utf-8")))
+    keep = _spread_sample(difficulty, max_questions, rng)
+    first, second, truth, difficulty = first[keep], second[keep], truth[keep], difficulty[keep]
+
+    questions = []
+    for a, b, is_true, level in zip(first, second, truth, difficulty):
+        questions.append(_question(
+            f"gen-{_slug(source)}-{_slug(value_col)}-{_slug(labels[a])}-vs-{_slug(labels[b])}",
+            f"{labels[a]} has a higher {prompt} than {labels[b]}.",
+            ["True", "False"],
+            "True" if is_true else "False",
+            f"{labels[a]}: {value_format.format(values[a])}; {labels[b]}: {value_format.format(values[b])}.",
+            topic, str(level), source
+        ))
+    return questions
+
+def _change_options(percent):
+    """Answer and distractors for a percent change, as whole-number phrases."""
+    magnitude = max(1, int(round(abs(percent))))
+    step = max(3, int(round(magnitude / 2)))
+    direction, opposite = ("Increased", "Decreased") if percent > 0 else ("Decreased", "Increased")
+    smaller = magnitude - step if magnitude - step >= 1 else magnitude + 2 * step
+    answer = f"{direction} by about {magnitude}%"
+    options = sorted([
+        answer,
+        f"{opposite} by about {magnitude}%",
+        f"{direction} by about {magnitude + step}%",
+        f"{direction} by about {smaller}%",
+    ])
+    return answer, options
+
+def change_questions(trends_df, value_col, prompt, value_format, topic, source):
+    """
+    "How did ... change from year A to year B?" for every pair of years,
+    with percent changes computed for all pairs at once. Changes under 1%
+    are skipped; spans of a single year are hard.
+    """
+    years = trends_df["Year"].to_numpy()
+    values = trends_df[value_col].to_numpy(dtype=float)
+    i, j = np.triu_indices(len(values), k=1)
+    percent = (values[j] - values[i]) / values[i] * 100
+    keep = np.abs(percent) >= 1
+    i, j, percent = i[keep], j[keep], percent[keep]
+
+    questions = []
+    for a, b, change in zip(i, j, percent):
+        answer, options = _change_options(change)
+        questions.append(_question(
+            f"gen-{_slug(source)}-{_slug(value_col)}-change-{years[a]}-{years[b]}",
+            f"From {years[a]} to {years[b]}, {prompt}:",
+            options,
+            answer,
+            f"{prompt[0].upper() + prompt[1:]} went from {value_format.format(values[a])} in {years[a]} "
+            f"to {value_format.format(values[b])} in {years[b]}, a change of {change:+.1f}%.",
+            topic, "hard" if years[b] - years[a] == 1 else "medium", source
+        ))
+    return questions
+
+def maltreatment_type_questions(trends_df):
+    """Which reported type was most common in each year."""
+    types = trends_df[list(MALTREATMENT_TYPE_COLUMNS)].to_numpy(dtype=float)
+    names = list(MALTREATMENT_TYPE_COLUMNS.values())
+    top = types.argmax(axis=1)
+    questions = []
+    for year, row, best in zip(trends_df["Year"], types, top):
+        answer = names[best]
+        questions.append(_question(
+            f"gen-national-trends-most-common-type-{year}",
+            f"Which type of maltreatment was most common among substantiated cases in {year}?",
+            names + ["Emotional abuse"],
+            answer,
+            f"In {year}, {answer.lower()} accounted for {row[best]:.1f}% of cases.",
+            "maltreatment types", "easy", "national trends"
+        ))
+    return questions
+
+def generate_questions(state_df, trends_df, age_df, disparities_df, perpetrator_df):
+    """
+    Build quiz questions from the current datasets. The result is the same
+    for the same data, so it can be generated once per dataset version.
+    """
+    questions = []
+    for column, prompt, value_format, topic, source in STATE_METRICS:
+        questions += extreme_questions(state_df, "State", column, prompt, value_format, topic, source, "state")
+        questions += pair_questions(state_df, "State", column, prompt, value_format, topic, source)
+
+    age_args = ("Age_Group", "Victim_Rate", "victimization rate", "{:.1f} per 1,000 children", "age", "age data")
+    questions += extreme_questions(age_df, *age_args, "age group")
+    questions += pair_questions(age_df, *age_args)
+
+    race_args = ("Race", "Victim_Rate", "victim rate", "{:.1f} per 1,000 children", "disparities", "disparities data")
+    questions += extreme_questions(disparities_df, *race_args, "group")
+    questions += pair_questions(disparities_df, *race_args)
+
+    # Residual categories make poor answers, so they only appear as distractors
+    known = perpetrator_df[~perpetrator_df["Relationship"].isin(["Other", "Unknown/Missing"])]
+    perpetrator_args = ("Relationship", "Percentage", "share of perpetrators", "{:.1f}%", "perpetrators", "perpetrator data")
+    questions += extreme_questions(perpetrator_df, *perpetrator_args, "relationship to the victim", directions=("highest",))
+    questions += pair_questions(known, *perpetrator_args)
+
+    for column, prompt, value_format, topic, source in TREND_METRICS:
+        questions += change_questions(trends_df, column, prompt, value_format, topic, source)
+    questions += maltreatment_type_questions(trends_df)
+    return questions
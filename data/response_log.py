@@ -0,0 +1,184 @@
+import streamlit as st
+import atexit
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from data.item_ratings import ItemRatings
+
+RESPONSES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "quiz", "responses")
+# A new segment is started once the current one reaches this size
+SEGMENT_BYTES = 4 * 1024 * 1024
+SNAPSHOT_FILE = "snapshot.json"
+
+class QuestionStats:
+    """Attempts and correct answers per question, updated one response at a time."""
+
+    name = "questions"
+
+    def __init__(self):
+        self.attempts = {}
+        self.correct = {}
+
+    def update(self, record):
+        question_id = record["question"]
+        self.attempts[question_id] = self.attempts.get(question_id, 0) + 1
+        self.correct[question_id] = self.correct.get(question_id, 0) + bool(record["correct"])
+
+    def state(self):
+        return {"attempts": self.attempts, "correct": self.correct}
+
+    def restore(self, state):
+        self.attempts = dict(state["attempts"])
+        self.correct = dict(state["correct"])
+
+    def correct_rate(self, question_id):
+        """(share answered correctly, attempts) for a question, or None before any attempt."""
+        attempts = self.attempts.get(question_id, 0)
+        if not attempts:
+            return None
+        return self.correct[question_id] / attempts, attempts
+
+class ResponseLog:
+    """
+    Append-only log of quiz responses in numbered JSONL segments.
+    record() only puts the response on a queue; a background thread writes
+    queued responses in batches, then feeds them to the aggregators and
+    saves a snapshot of their state with the log position it covers. On
+    start the aggregators are restored from the snapshot and only the
+    responses written after it are replayed, so reading statistics never
+    scans the log. The log is meant for a single app process.
+    """
+
+    def __init__(self, directory=RESPONSES_DIR, aggregators=None, batch_size=200, flush_interval=1.0):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.aggregators = {a.name: a for a in (aggregators or [QuestionStats()])}
+        self.lock = threading.Lock()
+        self._queue = queue.Queue()
+        os.makedirs(directory, exist_ok=True)
+
+        self._segment, self._offset = self._recover()
+        self._thread = threading.Thread(target=self._run, name="quiz-response-log", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _segment_path(self, number):
+        return os.path.join(self.directory, f"responses-{number:06d}.jsonl")
+
+    def _segments(self):
+        return sorted(
+            int(os.path.basename(path)[len("responses-"):-len(".jsonl")])
+            for path in glob.glob(os.path.join(self.directory, "responses-*.jsonl"))
+        )
+
+    def _recover(self):
+        """Restore the aggregators and return the segment and offset to append at."""
+        segment, offset = 1, 0
+        snapshot_path = os.path.join(self.directory, SNAPSHOT_FILE)
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+            segment, offset = snapshot["segment"], snapshot["offset"]
+            for name, state in snapshot["aggregates"].items():
+                if name in self.aggregators:
+                    self.aggregators[name].restore(state)
+
+        # Replay what was written after the snapshot
+        segments = [n for n in self._segments() if n >= segment]
+        for number in segments:
+            with open(self._segment_path(number), "rb") as f:
+                f.seek(offset if number == segment else 0)
+                for line in f:
+                    if line.endswith(b"\n"):
+                        self._aggregate(json.loads(line))
+        if segments:
+            segment = segments[-1]
+            path = self._segment_path(segment)
+            offset = os.path.getsize(path)
+            with open(path, "rb") as f:
+                f.seek(max(0, offset - 1))
+                # A write cut short leaves a partial line; continue in a fresh segment
+                if offset and f.read(1) != b"\n":
+                    segment, offset = segment + 1, 0
+        return segment, offset
+
+    def _aggregate(self, record):
+        for aggregator in self.aggregators.values():
+            aggregator.update(record)
+
+    def record(self, **response):
+        """Queue a response (e.g. question, answer, correct) for writing; never blocks on I/O."""
+        response.setdefault("time", time.time())
+        self._queue.put(response)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while batch[-1] is not None and len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            stop = batch[-1] is None
+            records = [r for r in batch if r is not None]
+            if records:
+                self._write(records)
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, records):
+        if self._offset >= SEGMENT_BYTES:
+            self._segment, self._offset = self._segment + 1, 0
+        payload = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records).encode("utf-8")
+        with open(self._segment_path(self._segment), "ab") as f:
+            f.write(payload)
+        self._offset += len(payload)
+
+        with self.lock:
+            for record in records:
+                self._aggregate(record)
+            snapshot = {
+                "segment": self._segment,
+                "offset": self._offset,
+                "aggregates": {name: a.state() for name, a in self.aggregators.items()}
+            }
+            payload = json.dumps(snapshot, separators=(",", ":"))
+        snapshot_path = os.path.join(self.directory, SNAPSHOT_FILE)
+        with open(snapshot_path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(snapshot_path + ".tmp", snapshot_path)
+
+    def flush(self):
+        """Block until every queued response is written and aggregated."""
+        self._queue.join()
+
+    def close(self):
+        """Write what is queued and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def correct_rate(self, question_id):
+        """QuestionStats.correct_rate for a question, from the in-memory aggregate."""
+        with self.lock:
+            return self.aggregators[QuestionStats.name].correct_rate(question_id)
+
+@st.cache_resource(show_spinner=False)
+def get_response_log(_question_bank):
+    """
+    The ResponseLog shared by every session of the app, with question stats
+    and ratings. The bank is registered with the ratings before the log is
+    replayed, so replayed responses start from the same difficulty priors
+    as live ones. The log is built once; later banks are registered by the
+    caller.
+    """
+    item_ratings = ItemRatings()
+    item_ratings.register_bank(_question_bank)
+    return ResponseLog(aggregators=[QuestionStats(), item_ratings])
@@ -9,7 +9,8 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.helpers import load_css, create_story_container, display_fact_box, create_quote_box, highlight_stat, generate_random_story
-from utils.charts import create_line_chart, create_area_chart
+from utils.stories import story_seed, new_story
+from utils.charts import create_line_chart, create_area_chart, stack_charts, maltreatment_color, MALTREATMENT_TYPES
 from data.data_loader import get_national_trends, get_quotes, get_age_data
 
 # Page configuration
@@ -61,7 +62,7 @@ with col1:
     # Chart for selected year with breakdown
     # Create a dataframe for the chart
     breakdown_data = pd.DataFrame({
-        'Category': ['Neglect', 'Physical Abuse', 'Sexual Abuse', 'Other'],
+        'Category': MALTREATMENT_TYPES,
         'Percentage': [
             data_year['Neglect_Percent'], 
             data_year['Physical_Abuse_Percent'], 
@@ -74,10 +75,7 @@ with col1:
     breakdown_chart = alt.Chart(breakdown_data).mark_bar().encode(
         x=alt.X('Percentage:Q', title='Percentage'),
         y=alt.Y('Category:N', title='Type of Maltreatment', sort='-x'),
-        color=alt.Color('Category:N', scale=alt.Scale(
-            domain=['Neglect', 'Physical Abuse', 'Sexual Abuse', 'Other'],
-            range=['#3498db', '#e74c3c', '#9b59b6', '#95a5a6']
-        )),
+        color=maltreatment_color('Category'),
         tooltip=['Category', 'Percentage']
     ).properties(
         title=f'Types of Maltreatment in {year}'
@@ -98,10 +96,12 @@ with col1:
                         "Fatalities remain high, reminding us that for the youngest children, every loss is a failure of the support system designed to protect them.")
     
     # Story element
+    # The story only changes with the year or when the reader asks for another
     create_story_container(
-        generate_random_story(year=year), 
+        generate_random_story(year=year, seed=story_seed("narrative_story_seed")), 
         "A Child's Experience"
     )
+    st.button("Read another story", on_click=new_story, args=("narrative_story_seed",))
     
     # Age data
     st.markdown("## Children at Greatest Risk")
@@ -169,23 +169,24 @@ with col2:
     
     # National trends mini chart
     st.markdown("## Trends at a Glance")
-    victims_chart = create_area_chart(
-        trends_df, 
-        'Year', 
-        'Victims', 
-        'Child Maltreatment Victims Over Time',
-        '#3498db'
-    )
-    st.altair_chart(victims_chart, use_container_width=True)
-    
-    fatalities_chart = create_area_chart(
-        trends_df, 
-        'Year', 
-        'Fatalities', 
-        'Child Fatalities Over Time',
-        '#e74c3c'
-    )
-    st.altair_chart(fatalities_chart, use_container_width=True)
+    # Both charts share one element so trends_df is embedded once
+    trend_charts = stack_charts([
+        create_area_chart(
+            trends_df, 
+            'Year', 
+            'Victims', 
+            'Child Maltreatment Victims Over Time',
+            '#3498db'
+        ),
+        create_area_chart(
+            trends_df, 
+            'Year', 
+            'Fatalities', 
+            'Child Fatalities Over Time',
+            '#e74c3c'
+        )
+    ])
+    st.altair_chart(trend_charts, use_container_width=True)
     
     # Key terms and definitions
     st.markdown("## Key Terms")
@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 import altair as alt
 import numpy as np
 import sys
@@ -9,7 +8,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.helpers import load_css, display_fact_box, animate_stat_reveal, create_impact_visualization
-from utils.charts import create_line_chart, create_multi_line_chart, create_area_chart, create_stacked_area_chart
+from utils.charts import create_line_chart, create_multi_line_chart, create_area_chart, create_stacked_area_chart, maltreatment_color, MALTREATMENT_TYPES
 from data.data_loader import get_national_trends
 
 # Page configuration
@@ -107,7 +106,8 @@ create_impact_visualization(
     int(latest_data["Victims"]), 
     icon="👧👦", 
     title="Children Affected Annually", 
-    description="children were victims of maltreatment in the most recent reporting year"
+    description="children were victims of maltreatment in the most recent reporting year",
+    unit_chart=True
 )
 
 # Victims trend chart
@@ -197,37 +197,22 @@ with tab2:
 with tab3:
     st.markdown("### Maltreatment Types Over Time")
     
-    # Create a dataframe for maltreatment types
-    types_df = trends_df[["Year", "Neglect_Percent", "Physical_Abuse_Percent", "Sexual_Abuse_Percent"]].copy()
-    
-    # Calculate "Other" category
-    types_df["Other_Percent"] = 100 - (types_df["Neglect_Percent"] + types_df["Physical_Abuse_Percent"] + types_df["Sexual_Abuse_Percent"])
-    
-    # Melt the dataframe for easier charting
-    melted_df = pd.melt(
-        types_df, 
-        id_vars=["Year"], 
-        value_vars=["Neglect_Percent", "Physical_Abuse_Percent", "Sexual_Abuse_Percent", "Other_Percent"],
-        var_name="Maltreatment_Type", 
-        value_name="Percentage"
+    # Create a dataframe for maltreatment types, one column per type
+    types_df = trends_df[["Year", "Neglect_Percent", "Physical_Abuse_Percent", "Sexual_Abuse_Percent"]].rename(
+        columns={"Neglect_Percent": "Neglect", "Physical_Abuse_Percent": "Physical Abuse", "Sexual_Abuse_Percent": "Sexual Abuse"}
     )
     
-    # Clean up type names for display
-    melted_df["Maltreatment_Type"] = melted_df["Maltreatment_Type"].str.replace("_Percent", "")
+    # Calculate "Other" category
+    types_df["Other"] = 100 - (types_df["Neglect"] + types_df["Physical Abuse"] + types_df["Sexual Abuse"])
     
-    # Create stacked area chart
-    stacked_chart = alt.Chart(melted_df).mark_area().encode(
+    # Create stacked area chart; the types are folded into rows in the browser, so one row per year is shipped
+    stacked_chart = alt.Chart(types_df).transform_fold(
+        MALTREATMENT_TYPES, as_=["Maltreatment_Type", "Percentage"]
+    ).mark_area().encode(
         x=alt.X("Year:O", title="Year"),
         y=alt.Y("Percentage:Q", title="Percentage", stack="normalize"),
-        color=alt.Color(
-            "Maltreatment_Type:N", 
-            scale=alt.Scale(
-                domain=["Neglect", "Physical_Abuse", "Sexual_Abuse", "Other"],
-                range=["#3498db", "#e74c3c", "#9b59b6", "#95a5a6"]
-            ),
-            legend=alt.Legend(title="Maltreatment Type")
-        ),
-        tooltip=["Year", "Maltreatment_Type", "Percentage"]
+        color=maltreatment_color("Maltreatment_Type", title="Maltreatment Type"),
+        tooltip=["Year", "Maltreatment_Type:N", "Percentage:Q"]
     ).properties(
         title="Maltreatment Types as Percentage of Cases"
     ).interactive()
@@ -247,21 +232,18 @@ with tab3:
 st.markdown("## Interactive Exploration")
 st.markdown("Compare multiple metrics over time to understand relationships between different aspects of child maltreatment.")
 
-# Let users select which metrics to compare
-metrics_to_compare = st.multiselect(
-    "Select metrics to compare:",
+# All metrics are shipped once; the legend toggles them in the browser
+multi_metric_chart = create_multi_line_chart(
+    trends_df,
+    "Year",
     ["Victims", "Fatalities", "Victim_Rate"],
-    default=["Victims", "Fatalities"]
+    "Comparison of Metrics Over Time",
+    toggle=True,
+    y_scale="normalized"
 )
-
-if metrics_to_compare:
-    multi_metric_chart = create_multi_line_chart(
-        trends_df,
-        "Year",
-        metrics_to_compare,
-        "Comparison of Selected Metrics Over Time"
-    )
-    st.altair_chart(multi_metric_chart, use_container_width=True)
+st.altair_chart(multi_metric_chart, use_container_width=True)
+st.caption("Click a metric in the legend to highlight it, or shift-click to compare several. "
+           "Each metric is scaled to its own maximum so they can share one axis.")
 
 # Data sources and methodology
 with st.expander("Data Sources & Methodology"):
@@ -2,15 +2,15 @@ import streamlit as st
 import pandas as pd
 import altair as alt
 import folium
-from streamlit_folium import st_folium
 import sys
 import os
 
 # Add the parent directory to the path to import from utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.helpers import load_css, display_fact_box, create_comparison_bar
-from utils.charts import create_interactive_map, create_bar_chart, create_choropleth_map, create_pie_chart
+from utils.helpers import load_css, display_fact_box, create_metric_card_grid, create_comparison_panel
+from utils.charts import create_interactive_map, create_bar_chart, create_choropleth_map, create_pie_chart, create_linked_state_views, render_map, create_small_multiples, use_data_transport, maltreatment_color, MALTREATMENT_TYPES
+from utils.geo import get_region_index
 from data.data_loader import get_state_data
 
 # Page configuration
@@ -34,7 +34,7 @@ Use the interactive map and state selector to dive into specific state data.
 state_df = get_state_data()
 
 # Create tabs for different views
-tab1, tab2, tab3 = st.tabs(["Interactive Map", "State Comparison", "State Details"])
+tab1, tab2, tab3, tab4 = st.tabs(["Interactive Map", "State Comparison", "State Details", "Linked View"])
 
 with tab1:
     st.markdown("## Interactive U.S. Map of Child Maltreatment Statistics")
@@ -68,8 +68,29 @@ with tab1:
         zoom_start=4
     )
     
-    # Display the map
-    st_folium(m, width=1000, height=500)
+    # Display the map; only clicks are sent back, so panning and zooming never rerun the page
+    map_events = render_map(
+        m,
+        key="state_map",
+        events=("last_object_clicked", "last_clicked"),
+        width=1000,
+        height=500
+    )
+    
+    # Resolve new clicks to a state and preselect it in the State Details tab
+    state_index = get_region_index()
+    for event in ("last_object_clicked", "last_clicked"):
+        point = map_events[event]
+        if point and point != st.session_state.get(f"resolved_{event}"):
+            st.session_state[f"resolved_{event}"] = point
+            clicked_state = state_index.lookup(point["lat"], point["lng"])
+            if clicked_state in set(state_df["State"]):
+                st.session_state["selected_state"] = clicked_state
+                st.session_state["clicked_state"] = clicked_state
+    
+    if st.session_state.get("clicked_state"):
+        st.caption(f"Selected {st.session_state['clicked_state']} from the map. Open the State Details tab to explore it.")
+    st.caption(f"Map interactions have triggered {st.session_state['state_map_reruns']} page reruns this session.")
     
     st.markdown("""
     **Note:** The map displays the locations of state capitals or major cities as proxies for state locations.
@@ -138,8 +159,8 @@ with tab2:
             types_comparison = types_comparison.append({
                 "State": state,
                 "Neglect": state_row["Neglect_Percent"],
-                "Physical": state_row["Physical_Percent"],
-                "Sexual": state_row["Sexual_Percent"],
+                "Physical Abuse": state_row["Physical_Percent"],
+                "Sexual Abuse": state_row["Sexual_Percent"],
                 "Other": 100 - (state_row["Neglect_Percent"] + state_row["Physical_Percent"] + state_row["Sexual_Percent"])
             }, ignore_index=True)
         
@@ -147,7 +168,7 @@ with tab2:
         melted_types = pd.melt(
             types_comparison, 
             id_vars=["State"], 
-            value_vars=["Neglect", "Physical", "Sexual", "Other"],
+            value_vars=MALTREATMENT_TYPES,
             var_name="Type", 
             value_name="Percentage"
         )
@@ -156,13 +177,7 @@ with tab2:
         type_chart = alt.Chart(melted_types).mark_bar().encode(
             x=alt.X("State:N", title="State"),
             y=alt.Y("Percentage:Q", title="Percentage", stack="normalize"),
-            color=alt.Color(
-                "Type:N", 
-                scale=alt.Scale(
-                    domain=["Neglect", "Physical", "Sexual", "Other"],
-                    range=["#3498db", "#e74c3c", "#9b59b6", "#95a5a6"]
-                )
-            ),
+            color=maltreatment_color("Type"),
             tooltip=["State", "Type", "Percentage"]
         ).properties(
             title="Maltreatment Types by State (%)"
@@ -178,7 +193,8 @@ with tab3:
     # State selector
     selected_state = st.selectbox(
         "Select a state:",
-        sorted(state_df["State"].unique())
+        sorted(state_df["State"].unique()),
+        key="selected_state"
     )
     
     # Get the data for the selected state
@@ -191,79 +207,39 @@ with tab3:
         st.markdown(f"### {selected_state} Statistics")
         
         # Key metrics
-        st.markdown(f"""
-        <div class="metric-card">
-            <h3>Child Victims</h3>
-            <div class="metric-value">{int(state_info['Victims']):,}</div>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown(f"""
-        <div class="metric-card">
-            <h3>Victimization Rate</h3>
-            <div class="metric-value">{state_info['Victim_Rate']}</div>
-            <div class="metric-description">per 1,000 children</div>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown(f"""
-        <div class="metric-card">
-            <h3>Child Fatalities</h3>
-            <div class="metric-value">{int(state_info['Fatalities']):,}</div>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Compare to national averages
-        st.markdown("### Comparison to National Averages")
+        create_metric_card_grid([
+            {"title": "Child Victims", "value": f"{int(state_info['Victims']):,}"},
+            {"title": "Victimization Rate", "value": state_info["Victim_Rate"], "description": "per 1,000 children"},
+            {"title": "Child Fatalities", "value": f"{int(state_info['Fatalities']):,}"}
+        ])
         
         # Calculate national averages
         nat_avg_victims = state_df["Victims"].mean()
         nat_avg_rate = state_df["Victim_Rate"].mean()
         nat_avg_fatalities = state_df["Fatalities"].mean()
         
-        # Create comparison bars
-        st.markdown("#### Victims")
-        create_comparison_bar(
-            int(state_info["Victims"]), 
-            int(state_df["Victims"].max()), 
-            selected_state
-        )
-        create_comparison_bar(
-            int(nat_avg_victims), 
-            int(state_df["Victims"].max()), 
-            "National Average"
-        )
-        
-        st.markdown("#### Victimization Rate")
-        create_comparison_bar(
-            state_info["Victim_Rate"], 
-            state_df["Victim_Rate"].max(), 
-            selected_state
-        )
-        create_comparison_bar(
-            nat_avg_rate, 
-            state_df["Victim_Rate"].max(), 
-            "National Average"
-        )
-        
-        st.markdown("#### Fatalities")
-        create_comparison_bar(
-            int(state_info["Fatalities"]), 
-            int(state_df["Fatalities"].max()), 
-            selected_state
-        )
-        create_comparison_bar(
-            int(nat_avg_fatalities), 
-            int(state_df["Fatalities"].max()), 
-            "National Average"
-        )
+        # Compare to national averages in one panel
+        create_comparison_panel([
+            ("Victims", [
+                (int(state_info["Victims"]), int(state_df["Victims"].max()), selected_state),
+                (int(nat_avg_victims), int(state_df["Victims"].max()), "National Average")
+            ]),
+            ("Victimization Rate", [
+                (state_info["Victim_Rate"], state_df["Victim_Rate"].max(), selected_state),
+                (nat_avg_rate, state_df["Victim_Rate"].max(), "National Average")
+            ]),
+            ("Fatalities", [
+                (int(state_info["Fatalities"]), int(state_df["Fatalities"].max()), selected_state),
+                (int(nat_avg_fatalities), int(state_df["Fatalities"].max()), "National Average")
+            ])
+        ], title="Comparison to National Averages")
     
     with col2:
         st.markdown("### Maltreatment Type Breakdown")
         
         # Create data for pie chart
         type_data = pd.DataFrame({
-            "Type": ["Neglect", "Physical Abuse", "Sexual Abuse", "Other"],
+            "Type": MALTREATMENT_TYPES,
             "Percentage": [
                 state_info["Neglect_Percent"],
                 state_info["Physical_Percent"],
@@ -321,6 +297,25 @@ with tab3:
             
             st.altair_chart(regional_chart, use_container_width=True)
 
+with tab4:
+    st.markdown("## Linked State View")
+    st.markdown("""
+    The map, comparison and rankings below share one dataset and react to each other in your browser.
+    Click a state to highlight it everywhere, shift-click to build a group, or drag across the
+    comparison chart to select a range of values. Double-click a view to clear its selection.
+    """)
+    
+    linked_chart = create_linked_state_views(
+        state_df[["State", "Latitude", "Longitude", "Victims", "Victim_Rate", "Fatalities"]],
+        "State",
+        "Latitude",
+        "Longitude",
+        ["Victim_Rate", "Victims", "Fatalities"],
+        "Child Maltreatment by State"
+    )
+    
+    st.altair_chart(linked_chart)
+
 # State rankings section
 st.markdown("## State Rankings")
 
@@ -360,6 +355,27 @@ ranking_chart = create_bar_chart(
 
 st.altair_chart(ranking_chart, use_container_width=True)
 
+# Every state in one faceted chart
+with st.expander("All States at a Glance"):
+    all_types = state_df[["State", "Neglect_Percent", "Physical_Percent", "Sexual_Percent"]].rename(columns={
+        "Neglect_Percent": "Neglect",
+        "Physical_Percent": "Physical",
+        "Sexual_Percent": "Sexual"
+    })
+    all_types["Other"] = 100 - (all_types["Neglect"] + all_types["Physical"] + all_types["Sexual"])
+    all_types = pd.melt(all_types, id_vars=["State"], var_name="Type", value_name="Percentage")
+    
+    small_multiples = create_small_multiples(
+        all_types,
+        "Type",
+        "Percentage",
+        "State",
+        "Maltreatment Type Breakdown for Every State (%)",
+        mark="bar"
+    )
+    # The largest dataset on the page is served as a file the browser can cache between reruns
+    st.altair_chart(use_data_transport(small_multiples))
+
 # Data sources and methodology
 with st.expander("Data Sources & Methodology"):
     st.markdown("""
@@ -3,12 +3,12 @@ import pandas as pd
 import random
 import sys
 import os
-import time
 
 # Add the parent directory to the path to import from utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.helpers import load_css, create_quote_box, display_fact_box, generate_random_story
+from utils.helpers import load_css, create_story_container, create_quote_box, display_fact_box, generate_random_story
+from utils.stories import story_seed, new_story
 from data.data_loader import get_quotes
 
 # Page configuration
@@ -193,30 +193,17 @@ with col2:
     # Create an animation that "humanizes" a statistic
     st.markdown("### Behind the Numbers")
     
-    if st.button("Explore a Story Behind the Numbers"):
-        with st.spinner("Creating a story..."):
-            time.sleep(1)  # Brief delay for animation effect
-            
-            # Display a randomly generated story
-            story = generate_random_story()
-            
-            # Display the story in a styled container
-            st.markdown(f"""
-            <div style="
-                background-color: #f0f9ff;
-                border: 1px solid #3498db;
-                border-radius: 10px;
-                padding: 20px;
-                margin: 20px 0;
-            ">
-                <h4 style="color: #3498db; margin-top: 0;">A Story Behind the Statistics</h4>
-                <p>{story}</p>
-                <p style="font-style: italic; color: #7f8c8d; margin-bottom: 0;">
-                    This is a representative narrative based on common patterns in child maltreatment cases.
-                    It is not a real case but reflects experiences shared by many children.
-                </p>
-            </div>
-            """, unsafe_allow_html=True)
+    # The story stays until the button is pressed again, rather than vanishing on the next rerun
+    st.button("Explore a Story Behind the Numbers", on_click=new_story, args=("survivor_story_seed",))
+    if "survivor_story_seed" in st.session_state:
+        create_story_container(
+            generate_random_story(seed=story_seed("survivor_story_seed")),
+            "A Story Behind the Statistics"
+        )
+        st.caption(
+            "This is a representative narrative based on common patterns in child maltreatment cases. "
+            "It is not a real case but reflects experiences shared by many children."
+        )
     
     # Resources for survivors
     st.markdown("## Resources for Survivors")
@@ -1,15 +1,17 @@
 import streamlit as st
 import pandas as pd
-import random
 import time
 import sys
 import os
+import uuid
 
 # Add the parent directory to the path to import from utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.helpers import load_css, display_fact_box, show_success_message
-from data.data_loader import get_quiz_questions
+from data.question_bank import get_question_bank, DIFFICULTIES
+from data.response_log import get_response_log
+from data.item_ratings import ItemRatings, INITIAL_RATING, update_player
 
 # Page configuration
 st.set_page_config(
@@ -28,20 +30,99 @@ Test your understanding of child maltreatment data and issues with this interact
 Learn key facts while assessing your knowledge about this important topic.
 """)
 
-# Initialize or get session state for tracking quiz progress
-if 'quiz_started' not in st.session_state:
-    st.session_state.quiz_started = False
-    st.session_state.current_question = 0
-    st.session_state.score = 0
-    st.session_state.answered_questions = []
-    st.session_state.total_questions = 0
-    st.session_state.quiz_completed = False
+# Load the question bank index; questions are read only once selected
+question_bank = get_question_bank()
+response_log = get_response_log(question_bank)
+# Elo difficulty of every question, kept up to date by the response log's writer;
+# a bank rebuilt since the log was created is registered here
+item_ratings = response_log.aggregators[ItemRatings.name]
+item_ratings.register_bank(question_bank)
+MAX_QUIZ_QUESTIONS = 20
+# Share of participants answering correctly is shown once a question has this many responses
+MIN_RESPONSES_FOR_RATE = 5
 
-# Load quiz questions
-all_questions = get_quiz_questions()
+# The quiz is a state machine: "intro" -> "question" (once per question) -> "results".
+# Only question ids and chosen option indexes are kept; every transition happens in a
+# widget callback, which runs before the script, so each click costs a single rerun.
+if "quiz_phase" not in st.session_state:
+    st.session_state.quiz_phase = "intro"
+    st.session_state.quiz_ids = []
+    st.session_state.quiz_answers = []
+    # Anonymous id grouping one browser session's responses in the log
+    st.session_state.quiz_session = uuid.uuid4().hex
+    # The player's Elo rating carries over between quizzes in a session
+    st.session_state.quiz_rating = INITIAL_RATING
+
+def next_adaptive_question(asked):
+    """The question not in asked that best matches the player's rating, or None."""
+    return item_ratings.next_question(
+        st.session_state.quiz_rating,
+        exclude=set(asked),
+        groups=question_bank.combination_keys(st.session_state.quiz_filters)
+    )
+
+def start_quiz():
+    filters = {
+        "topic": st.session_state.get("quiz_topics", []),
+        "difficulty": st.session_state.get("quiz_difficulties", [])
+    }
+    st.session_state.quiz_filters = filters
+    short_length = st.session_state.get("quiz_short_length")
+    st.session_state.quiz_total = st.session_state.quiz_length if short_length is None else short_length
+    st.session_state.quiz_adaptive = st.session_state.get("quiz_adaptive_mode", False)
+    st.session_state.quiz_answers = []
+    if st.session_state.quiz_adaptive:
+        # Adaptive quizzes choose each question after the previous answer
+        first_id = next_adaptive_question([])
+        st.session_state.quiz_ids = [] if first_id is None else [first_id]
+    else:
+        st.session_state.quiz_ids = question_bank.sample(st.session_state.quiz_total, filters)
+        st.session_state.quiz_total = len(st.session_state.quiz_ids)
+    # Stay on the introduction if no question matches
+    if st.session_state.quiz_ids:
+        st.session_state.quiz_phase = "question"
+
+def submit_answer():
+    position = len(st.session_state.quiz_answers)
+    answer = st.session_state[f"quiz_answer_{position}"]
+    st.session_state.quiz_answers.append(answer)
+    
+    question_id = st.session_state.quiz_ids[position]
+    question_data = question_bank.get(question_id)
+    correct = question_data["options"][answer] == question_data["answer"]
+    player_rating = st.session_state.quiz_rating
+    response_log.record(
+        session=st.session_state.quiz_session,
+        question=question_id,
+        answer=answer,
+        correct=correct,
+        rating=player_rating
+    )
+    st.session_state.quiz_rating = update_player(player_rating, item_ratings.rating(question_id), correct)
+    
+    if len(st.session_state.quiz_answers) >= st.session_state.quiz_total:
+        st.session_state.quiz_phase = "results"
+    elif st.session_state.quiz_adaptive:
+        next_id = next_adaptive_question(st.session_state.quiz_ids)
+        if next_id is None:
+            st.session_state.quiz_phase = "results"
+        else:
+            st.session_state.quiz_ids.append(next_id)
+
+def restart_quiz():
+    st.session_state.quiz_phase = "intro"
+    st.session_state.quiz_ids = []
+    st.session_state.quiz_answers = []
+
+def answer_review(position):
+    """Question, chosen and correct answers and explanation for an answered position."""
+    question_id = st.session_state.quiz_ids[position]
+    question_data = question_bank.get(question_id)
+    user_answer = question_data["options"][st.session_state.quiz_answers[position]]
+    return question_data, user_answer, user_answer == question_data["answer"], question_bank.explanation(question_id)
 
 # Quiz introduction section
-if not st.session_state.quiz_started and not st.session_state.quiz_completed:
+if st.session_state.quiz_phase == "intro":
     st.markdown("## Quiz Introduction")
     st.markdown("""
     This quiz will test your knowledge about child maltreatment statistics, risk factors,
@@ -55,44 +136,60 @@ if not st.session_state.quiz_started and not st.session_state.quiz_completed:
     col1, col2 = st.columns(2)
     
     with col1:
-        num_questions = st.slider(
-            "Number of questions:",
-            min_value=3,
-            max_value=len(all_questions),
-            value=5,
-            step=1
+        topics = st.multiselect("Topics (all if none selected):", question_bank.tag_values("topic"), key="quiz_topics")
+        difficulties = st.multiselect(
+            "Difficulty (all if none selected):",
+            [d for d in DIFFICULTIES if d in question_bank.tag_values("difficulty")],
+            key="quiz_difficulties"
+        )
+        available = question_bank.count({"topic": topics, "difficulty": difficulties})
+        
+        if available > 3:
+            # The slider's key is only written here, clamped into the range it is about to offer
+            max_length = min(available, MAX_QUIZ_QUESTIONS)
+            st.session_state.quiz_length = min(max(st.session_state.get("quiz_length", 5), 3), max_length)
+            st.session_state.quiz_short_length = None
+            st.slider(
+                "Number of questions:",
+                min_value=3,
+                max_value=max_length,
+                step=1,
+                key="quiz_length"
+            )
+        else:
+            # Too few questions for a slider; the quiz takes all of them
+            st.session_state.quiz_short_length = available
+            st.caption(f"{available} question{'s match' if available != 1 else ' matches'} these filters.")
+    
+        st.checkbox(
+            "Adaptive difficulty",
+            key="quiz_adaptive_mode",
+            help="Choose each question to match how you are doing, using difficulty ratings learned from past answers."
         )
     
     with col2:
         st.markdown("<br>", unsafe_allow_html=True)  # Spacing
-        start_button = st.button("Start Quiz")
-        
-        if start_button:
-            st.session_state.quiz_started = True
-            st.session_state.total_questions = num_questions
-            
-            # Randomly select questions
-            selected_indices = random.sample(range(len(all_questions)), num_questions)
-            st.session_state.selected_questions = [all_questions[i] for i in selected_indices]
-            
-            # Reset other states
-            st.session_state.current_question = 0
-            st.session_state.score = 0
-            st.session_state.answered_questions = []
-            
-            # Force a rerun to show the first question
-            st.experimental_rerun()
+        st.button("Start Quiz", on_click=start_quiz, disabled=available == 0)
 
 # Quiz in progress
-elif st.session_state.quiz_started and not st.session_state.quiz_completed:
-    # Get the current question
-    current_q = st.session_state.current_question
-    question_data = st.session_state.selected_questions[current_q]
+elif st.session_state.quiz_phase == "question":
+    current_q = len(st.session_state.quiz_answers)
+    total_questions = st.session_state.quiz_total
+    
+    # Feedback on the previous answer, shown with the next question
+    if current_q > 0:
+        previous, user_answer, is_correct, explanation = answer_review(current_q - 1)
+        if is_correct:
+            st.success(f"✓ Correct! {explanation}")
+        else:
+            st.error(f"✗ Incorrect. The correct answer is: {previous['answer']}. {explanation}")
+    
+    question_data = question_bank.get(st.session_state.quiz_ids[current_q])
     
     # Display progress
-    progress = (current_q) / st.session_state.total_questions
+    progress = current_q / total_questions
     st.progress(progress)
-    st.markdown(f"**Question {current_q + 1} of {st.session_state.total_questions}**")
+    st.markdown(f"**Question {current_q + 1} of {total_questions}**")
     
     # Display the question in a styled container
     st.markdown(f"""
@@ -101,52 +198,29 @@ elif st.session_state.quiz_started and not st.session_state.quiz_completed:
     </div>
     """, unsafe_allow_html=True)
     
-    # Show options
-    selected_answer = st.radio(
+    # Show options; the widget value is the option index
+    options = question_data['options']
+    st.radio(
         "Select your answer:",
-        question_data['options'],
-        key=f"question_{current_q}"
+        range(len(options)),
+        format_func=lambda i: options[i],
+        key=f"quiz_answer_{current_q}"
     )
     
     # Submit button
-    if st.button("Submit Answer"):
-        is_correct = selected_answer == question_data['answer']
-        
-        # Update score
-        if is_correct:
-            st.session_state.score += 1
-            st.success(f"✓ Correct! {question_data['explanation']}")
-        else:
-            st.error(f"✗ Incorrect. The correct answer is: {question_data['answer']}. {question_data['explanation']}")
-        
-        # Store the answered question
-        st.session_state.answered_questions.append({
-            'question': question_data['question'],
-            'user_answer': selected_answer,
-            'correct_answer': question_data['answer'],
-            'is_correct': is_correct,
-            'explanation': question_data['explanation']
-        })
-        
-        # Check if this was the last question
-        if current_q + 1 >= st.session_state.total_questions:
-            # Quiz is complete
-            st.session_state.quiz_completed = True
-            st.session_state.quiz_started = False
-        else:
-            # Move to next question
-            st.session_state.current_question += 1
-        
-        # Force a rerun to update the page
-        st.experimental_rerun()
+    st.button("Submit Answer", on_click=submit_answer)
 
 # Quiz completed
-elif st.session_state.quiz_completed:
+elif st.session_state.quiz_phase == "results":
+    reviews = [answer_review(i) for i in range(len(st.session_state.quiz_answers))]
+    score = sum(is_correct for _, _, is_correct, _ in reviews)
+    total_questions = len(reviews)
+    
     # Show the final score with animation
     st.markdown("## Quiz Results")
     
     # Calculate percentage
-    score_percent = (st.session_state.score / st.session_state.total_questions) * 100
+    score_percent = (score / total_questions) * 100
     
     # Display score with appropriate message
     if score_percent >= 80:
@@ -171,7 +245,7 @@ elif st.session_state.quiz_completed:
             text-align: center;
             margin: 20px 0;
         ">
-            <h2 style="color: {color}; margin-top: 0;">Your Score: {st.session_state.score}/{st.session_state.total_questions} ({score_percent:.0f}%)</h2>
+            <h2 style="color: {color}; margin-top: 0;">Your Score: {score}/{total_questions} ({score_percent:.0f}%)</h2>
             <p>{message}</p>
         </div>
         """, unsafe_allow_html=True)
@@ -179,18 +253,21 @@ elif st.session_state.quiz_completed:
     # Review of answers
     st.markdown("## Review Your Answers")
     
-    for i, item in enumerate(st.session_state.answered_questions):
-        with st.expander(f"Question {i+1}: {item['question']}"):
-            if item['is_correct']:
+    for i, (question_data, user_answer, is_correct, explanation) in enumerate(reviews):
+        with st.expander(f"Question {i+1}: {question_data['question']}"):
+            rate = response_log.correct_rate(st.session_state.quiz_ids[i])
+            if rate and rate[1] >= MIN_RESPONSES_FOR_RATE:
+                st.caption(f"{rate[0]:.0%} of participants got this right")
+            if is_correct:
                 st.markdown(f"""
-                <p><span class="correct-answer">✓ You answered correctly:</span> {item['user_answer']}</p>
-                <p><strong>Explanation:</strong> {item['explanation']}</p>
+                <p><span class="correct-answer">✓ You answered correctly:</span> {user_answer}</p>
+                <p><strong>Explanation:</strong> {explanation}</p>
                 """, unsafe_allow_html=True)
             else:
                 st.markdown(f"""
-                <p><span class="incorrect-answer">✗ Your answer:</span> {item['user_answer']}</p>
-                <p><span class="correct-answer">✓ Correct answer:</span> {item['correct_answer']}</p>
-                <p><strong>Explanation:</strong> {item['explanation']}</p>
+                <p><span class="incorrect-answer">✗ Your answer:</span> {user_answer}</p>
+                <p><span class="correct-answer">✓ Correct answer:</span> {question_data['answer']}</p>
+                <p><strong>Explanation:</strong> {explanation}</p>
                 """, unsafe_allow_html=True)
     
     # Additional learning resources
@@ -205,15 +282,7 @@ elif st.session_state.quiz_completed:
     """)
     
     # Option to retake the quiz
-    if st.button("Take Another Quiz"):
-        # Reset all quiz state
-        st.session_state.quiz_started = False
-        st.session_state.quiz_completed = False
-        st.session_state.current_question = 0
-        st.session_state.score = 0
-        st.session_state.answered_questions = []
-        # Force a rerun to show the intro screen
-        st.experimental_rerun()
+    st.button("Take Another Quiz", on_click=restart_quiz)
 
 # Key facts sidebar
 st.sidebar.markdown("## Quick Facts")
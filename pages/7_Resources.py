@@ -6,8 +6,9 @@ import os
 # Add the parent directory to the path to import from utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.helpers import load_css, create_resource_card
-from data.data_loader import get_resources
+from utils.helpers import load_css, create_resource_list
+from utils.search import get_resource_index, get_resource_facets, get_resource_point_index, tokenize
+from utils.geo import get_region_index
 
 # Page configuration
 st.set_page_config(
@@ -27,44 +28,82 @@ and research related to child maltreatment. Use the filters to find the resource
 relevant to your needs or interests.
 """)
 
-# Load resources data
-resources = get_resources()
+KM_PER_MILE = 1.609344
+
+resource_index = get_resource_index()
+facets = get_resource_facets()
 
 # Create filters sidebar
 st.sidebar.markdown("## Filter Resources")
-
-# Resource type filter
-resource_types = ["All Types", "Prevention", "Policy", "Support", "Research"]
-selected_type = st.sidebar.selectbox("Resource Type:", resource_types)
+facet_slot = st.sidebar.container()
 
 # Search functionality
 search_query = st.sidebar.text_input("Search Resources:", placeholder="Enter keywords...")
 
+# Search every category once with the cached index, keeping the ranked order;
+# a query of only stopwords filters nothing
+if tokenize(search_query):
+    match_ids = resource_index.search(search_query)
+    match_bits = facets.from_ids(match_ids)
+else:
+    match_ids = None
+    match_bits = facets.all
+
+# Selections come from session state so each facet's counts can reflect all the others
+selected_type = st.session_state.get("filter_type", "All Types")
+selection = {
+    "type": [] if selected_type == "All Types" else [selected_type],
+    "state": st.session_state.get("filter_state", []),
+    "language": st.session_state.get("filter_language", []),
+    "phone": ["Has phone number"] if st.session_state.get("filter_phone") else []
+}
+
+def facet_counts(facet):
+    """Counts per value of a facet under the search and every other facet's selection."""
+    return facets.counts(facet, match_bits & facets.mask(selection, exclude=facet))
+
+def with_counts(counts):
+    """format_func that shows a facet value with its count, e.g. "Hotline (12)"."""
+    return lambda value: value if value not in counts else f"{value} ({counts[value]:,})"
+
+# Counts are in the option labels; the widgets are keyed, so a changed label does not reset them
+with facet_slot:
+    # Types come from the index, so provider types are offered alongside the curated ones
+    resource_types = ["All Types"] + sorted(facets.bitmaps["type"])
+    st.selectbox("Resource Type:", resource_types, key="filter_type", format_func=with_counts(facet_counts("type")))
+    
+    # Location and language facets appear once the provider directory supplies them
+    if facets.bitmaps["state"]:
+        st.multiselect("State:", sorted(facets.bitmaps["state"]), key="filter_state",
+                       format_func=with_counts(facet_counts("state")))
+    if facets.bitmaps["language"]:
+        st.multiselect("Language:", sorted(facets.bitmaps["language"]), key="filter_language",
+                       format_func=with_counts(facet_counts("language")))
+    
+    phone_count = facet_counts("phone").get("Has phone number", 0)
+    st.checkbox(f"Only resources with a phone number ({phone_count:,})", key="filter_phone")
+
 # Main content
 st.markdown("## Available Resources")
 
 # Create tabs for different resource categories
-tab1, tab2, tab3, tab4 = st.tabs([
+tab1, tab2, tab3, tab4, tab5 = st.tabs([
     "📋 Prevention Programs", 
     "📜 Policies & Legislation", 
     "🤝 Support Organizations", 
-    "🔍 Research Centers"
+    "🔍 Research Centers",
+    "📍 Services Near Me"
 ])
 
+# Every filter combined is one AND of bitmaps
+filter_bits = match_bits & facets.mask(selection)
+filter_key = (search_query, repr(selection))
+
 # Helper function to filter resources
-def filter_resources(resources, category, resource_type, search_query):
-    filtered = resources[category]
-    
-    # Apply resource type filter if not "All Types"
-    if resource_type != "All Types":
-        filtered = [r for r in filtered if r["type"] == resource_type]
-    
-    # Apply search filter if provided
-    if search_query:
-        filtered = [r for r in filtered if search_query.lower() in r["name"].lower() 
-                   or search_query.lower() in r["description"].lower()]
-    
-    return filtered
+def filter_resources(category):
+    bits = filter_bits & facets.bitmaps["category"].get(category, 0)
+    ids = facets.select(match_ids, bits) if match_ids is not None else facets.ids(bits)
+    return [resource_index.documents[i] for i in ids]
 
 # Display resources in each tab
 with tab1:
@@ -75,16 +114,10 @@ with tab1:
     """)
     
     # Filter prevention programs
-    prevention_programs = filter_resources(resources, "Prevention Programs", selected_type, search_query)
+    prevention_programs = filter_resources("Prevention Programs")
     
     if prevention_programs:
-        for program in prevention_programs:
-            create_resource_card(
-                program["name"],
-                program["description"],
-                program["url"],
-                program["type"]
-            )
+        create_resource_list(prevention_programs, key="prevention_results", reset_on=filter_key)
     else:
         st.info("No prevention programs match your current filters.")
 
@@ -96,16 +129,10 @@ with tab2:
     """)
     
     # Filter policies
-    policies = filter_resources(resources, "Policies & Legislation", selected_type, search_query)
+    policies = filter_resources("Policies & Legislation")
     
     if policies:
-        for policy in policies:
-            create_resource_card(
-                policy["name"],
-                policy["description"],
-                policy["url"],
-                policy["type"]
-            )
+        create_resource_list(policies, key="policies_results", reset_on=filter_key)
     else:
         st.info("No policies match your current filters.")
 
@@ -117,19 +144,10 @@ with tab3:
     """)
     
     # Filter support organizations
-    support_orgs = filter_resources(resources, "Support Organizations", selected_type, search_query)
+    support_orgs = filter_resources("Support Organizations")
     
     if support_orgs:
-        for org in support_orgs:
-            # Check if the organization has a phone number
-            phone = org.get("phone", None)
-            create_resource_card(
-                org["name"],
-                org["description"],
-                org["url"],
-                org["type"],
-                phone
-            )
+        create_resource_list(support_orgs, key="support_results", reset_on=filter_key)
     else:
         st.info("No support organizations match your current filters.")
 
@@ -141,19 +159,67 @@ with tab4:
     """)
     
     # Filter research centers
-    research_centers = filter_resources(resources, "Research Centers", selected_type, search_query)
+    research_centers = filter_resources("Research Centers")
     
     if research_centers:
-        for center in research_centers:
-            create_resource_card(
-                center["name"],
-                center["description"],
-                center["url"],
-                center["type"]
-            )
+        create_resource_list(research_centers, key="research_results", reset_on=filter_key)
     else:
         st.info("No research centers match your current filters.")
 
+with tab5:
+    st.markdown("### Services Near Me")
+    st.markdown("""
+    Find local providers such as child advocacy centers, CPS offices and hotlines
+    closest to a location. The resource type filter and search box apply here too.
+    """)
+    
+    point_index = get_resource_point_index()
+    
+    if len(point_index) == 0:
+        st.info("No local provider directory is loaded. Add data/providers.csv with name, description, url, type, phone, latitude and longitude columns to enable this search.")
+    else:
+        region_index = get_region_index()
+        col_a, col_b = st.columns(2)
+        
+        with col_a:
+            location_state = st.selectbox("Your state:", sorted(region_index.names))
+            lat, lon = region_index.center(location_state)
+            if st.checkbox("Enter exact coordinates instead"):
+                lat = st.number_input("Latitude:", min_value=-90.0, max_value=90.0, value=float(lat), format="%.4f")
+                lon = st.number_input("Longitude:", min_value=-180.0, max_value=180.0, value=float(lon), format="%.4f")
+        
+        with col_b:
+            near_mode = st.radio("Show:", ["Nearest providers", "Within a distance"], horizontal=True)
+            if near_mode == "Nearest providers":
+                provider_count = st.slider("Number of providers:", 1, 50, 10)
+            else:
+                radius_miles = st.slider("Distance (miles):", 5, 250, 50, step=5)
+        
+        # The search and every sidebar filter are applied inside the spatial query
+        filter_flags = facets.flags(filter_bits)
+        def keep_provider(doc_id):
+            return filter_flags[doc_id]
+        
+        if near_mode == "Nearest providers":
+            nearby = point_index.nearest(lat, lon, k=provider_count, predicate=keep_provider)
+        else:
+            nearby = point_index.within(lat, lon, radius_miles * KM_PER_MILE, predicate=keep_provider)
+        
+        if nearby:
+            create_resource_list(
+                [
+                    dict(
+                        resource_index.documents[doc_id],
+                        description=f"{km / KM_PER_MILE:.1f} miles away · {resource_index.documents[doc_id]['description']}"
+                    )
+                    for doc_id, km in nearby
+                ],
+                key="nearby_results",
+                reset_on=(filter_key, lat, lon, near_mode)
+            )
+        else:
+            st.info("No providers match your location and filters.")
+
 # Emergency resources highlight
 st.markdown("## Emergency Resources")
 st.markdown("""
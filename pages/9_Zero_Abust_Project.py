@@ -9,7 +9,7 @@ import os
 # Add the parent directory to the path to import from utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.helpers import load_css, display_fact_box, create_impact_visualization
+from utils.helpers import load_css, display_fact_box_grid, create_impact_grid
 from utils.charts import create_bar_chart, create_line_chart, create_multi_line_chart, create_pie_chart
 
 # Page configuration
@@ -113,29 +113,17 @@ with tab1:
     # Program goals and approach
     st.markdown("## Program Goals and Approach")
     
-    col3, col4 = st.columns(2)
-    
-    with col3:
-        display_fact_box(
-            "Training Approach", 
-            "Zero Abuse Project programs use a trauma-informed, evidence-based approach that combines academic knowledge with practical skills development through simulations, case studies, and hands-on exercises."
-        )
-        
-        display_fact_box(
-            "Multi-Disciplinary Focus", 
-            "Programs bring together professionals from multiple disciplines, acknowledging that effective child protection requires collaboration across law enforcement, child welfare, medical, legal, and educational sectors."
-        )
-    
-    with col4:
-        display_fact_box(
-            "Addressing Training Deficits", 
-            "Programs specifically target identified training gaps such as interview techniques, identifying non-obvious signs of abuse, understanding trauma impacts, and coordinating multi-disciplinary responses."
-        )
-        
-        display_fact_box(
-            "Systemic Change", 
-            "Rather than just training individuals, programs aim to transform institutions and systems to better protect children by changing how universities prepare professionals and how organizations respond to child maltreatment."
-        )
+    # Laid out row by row, two boxes per row
+    display_fact_box_grid([
+        ("Training Approach", 
+         "Zero Abuse Project programs use a trauma-informed, evidence-based approach that combines academic knowledge with practical skills development through simulations, case studies, and hands-on exercises."),
+        ("Addressing Training Deficits", 
+         "Programs specifically target identified training gaps such as interview techniques, identifying non-obvious signs of abuse, understanding trauma impacts, and coordinating multi-disciplinary responses."),
+        ("Multi-Disciplinary Focus", 
+         "Programs bring together professionals from multiple disciplines, acknowledging that effective child protection requires collaboration across law enforcement, child welfare, medical, legal, and educational sectors."),
+        ("Systemic Change", 
+         "Rather than just training individuals, programs aim to transform institutions and systems to better protect children by changing how universities prepare professionals and how organizations respond to child maltreatment.")
+    ], columns=2)
 
 with tab2:
     # Impact Analysis section
@@ -207,31 +195,26 @@ with tab2:
     # Impact visualization
     st.markdown("## Nationwide Impact of Zero Abuse Project Training Programs")
     
-    col5, col6, col7 = st.columns(3)
-    
-    with col5:
-        create_impact_visualization(
-            number=35000, 
-            icon="👩‍🏫 👨‍🏫", 
-            title="Professionals Trained Annually", 
-            description="receive specialized child maltreatment training"
-        )
-    
-    with col6:
-        create_impact_visualization(
-            number=105, 
-            icon="🏛️", 
-            title="Academic Institutions", 
-            description="implementing CAST curriculum nationally"
-        )
-    
-    with col7:
-        create_impact_visualization(
-            number=20, 
-            icon="🌎", 
-            title="States with ChildFirst®", 
-            description="have replicated forensic interview training"
-        )
+    create_impact_grid([
+        {
+            "number": 35000, 
+            "icon": "👩‍🏫 👨‍🏫", 
+            "title": "Professionals Trained Annually", 
+            "description": "receive specialized child maltreatment training"
+        },
+        {
+            "number": 105, 
+            "icon": "🏛️", 
+            "title": "Academic Institutions", 
+            "description": "implementing CAST curriculum nationally"
+        },
+        {
+            "number": 20, 
+            "icon": "🌎", 
+            "title": "States with ChildFirst®", 
+            "description": "have replicated forensic interview training"
+        }
+    ], columns=3)
 
 with tab3:
     # Training Correlation Analysis
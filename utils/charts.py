@@ -1,4 +1,8 @@
 import streamlit as st
+import os
+import json
+import time
+import hashlib
 import pandas as pd
 import numpy as np
 import altair as alt
@@ -7,52 +11,274 @@ import seaborn as sns
 from matplotlib.colors import LinearSegmentedColormap
 import folium
 from streamlit_folium import st_folium
+from utils.pretransform import pretransform as pretransform_chart
+from utils.downsample import downsample_series, point_budget
+from utils.templates import Template, Markup
 
-def create_line_chart(data, x_col, y_col, title, color="#3498db", point=True):
-    """Create an interactive line chart using Altair."""
-    chart = alt.Chart(data).mark_line(point=point).encode(
+# Chart data files are written here and served by Streamlit's static file handler
+STATIC_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static", "chart-data")
+# Path of the chart data files below server.baseUrlPath
+STATIC_DATA_URL = "app/static/chart-data"
+# Data files no chart has used for this many seconds are deleted
+STATIC_DATA_MAX_AGE = 24 * 60 * 60
+
+# Project palette; the first four colors follow the order of MALTREATMENT_TYPES.
+# Streamlit's chart theme applies it from theme.chartCategoricalColors in .streamlit/config.toml,
+# which must list the same colors; the first one is also the default mark color.
+THEME_MARK_COLOR = "#3498db"
+THEME_CATEGORY_COLORS = ["#3498db", "#e74c3c", "#9b59b6", "#95a5a6", "#2ecc71", "#f39c12"]
+MALTREATMENT_TYPES = ["Neglect", "Physical Abuse", "Sexual Abuse", "Other"]
+
+# Waffle chart markup, compiled once; every square of a kind renders identically
+WAFFLE_HEADER = Template("""
+<h4>{title}: {value}/{max_value} ({share:.1%})</h4>
+<div style='display: grid; grid-template-columns: repeat({cols}, 1fr); gap: 2px; width: 100%;'>
+""")
+WAFFLE_FILLED = Template("<div style='aspect-ratio: 1; background-color: #3498db; display: flex; align-items: center; justify-content: center; color: white;'>{icon}</div>")
+WAFFLE_EMPTY = Template("<div style='aspect-ratio: 1; background-color: #eaecee; display: flex; align-items: center; justify-content: center; color: #bdc3c7;'>{icon}</div>")
+
+# SVG waffle: two repeating patterns fill at most four rectangles, so size is independent of cell count
+WAFFLE_SVG = Template("""
+<h4>{title}: {value}/{max_value} ({share:.1%})</h4>
+<svg viewBox="0 0 {cols} {rows}" width="100%" role="img" aria-label="{title}: {share:.1%}">
+<defs>
+<pattern id="{pattern_id}-on" width="1" height="1" patternUnits="userSpaceOnUse">{filled_cell}</pattern>
+<pattern id="{pattern_id}-off" width="1" height="1" patternUnits="userSpaceOnUse">{empty_cell}</pattern>
+</defs>
+<rect width="{cols}" height="{rows}" fill="url(#{pattern_id}-off)"/>
+<rect width="{cols}" height="{full_rows}" fill="url(#{pattern_id}-on)"/>
+<rect y="{full_rows}" width="{partial_cells}" height="1" fill="url(#{pattern_id}-on)"/>
+</svg>
+""")
+WAFFLE_SVG_CELL = Template(
+    '<rect x="0.06" y="0.06" width="0.88" height="0.88" fill="{fill}"/>'
+    '<text x="0.5" y="0.72" font-size="0.6" text-anchor="middle" fill="{text}">{icon}</text>'
+)
+
+def maltreatment_color(field, title=None):
+    """
+    Color encoding for maltreatment types.
+    Only the domain is written into the spec; the colors come from the
+    Streamlit chart theme's category range, so every page shows each type
+    the same way.
+    """
+    return alt.Color(
+        f"{field}:N",
+        scale=alt.Scale(domain=MALTREATMENT_TYPES),
+        legend=alt.Legend(title=title) if title else alt.Undefined
+    )
+
+def _mark_color(color):
+    """Mark color argument, left out of the spec when the theme already sets it."""
+    if not color or color == THEME_MARK_COLOR:
+        return alt.Undefined
+    return color
+
+def _static_data_url(filename):
+    """Absolute URL path of a chart data file, including the configured server.baseUrlPath."""
+    base = st.get_option("server.baseUrlPath").strip("/")
+    return "/" + "/".join(part for part in (base, STATIC_DATA_URL, filename) if part)
+
+def _prune_chart_data(max_age=STATIC_DATA_MAX_AGE):
+    """Delete data files, and leftover temporary files, not written or reused within max_age seconds."""
+    cutoff = time.time() - max_age
+    for name in os.listdir(STATIC_DATA_DIR):
+        path = os.path.join(STATIC_DATA_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except FileNotFoundError:
+            # Another session pruned it first
+            pass
+
+def _write_chart_data(payload, extension):
+    """
+    Write a payload under a content hash and return its URL. Existing files
+    are reused and their modification time refreshed, so files still in use
+    survive _prune_chart_data, which runs whenever a new file is written.
+    """
+    digest = hashlib.sha1(payload.encode("utf-8")).hexdigest()[:20]
+    filename = f"{digest}.{extension}"
+    path = os.path.join(STATIC_DATA_DIR, filename)
+    
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        os.makedirs(STATIC_DATA_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        _prune_chart_data()
+    
+    return _static_data_url(filename)
+
+def use_data_transport(chart, transport="columnar"):
+    """
+    Move a chart's DataFrame out of the spec into a static data file.
+    "columnar" writes one JSON object of column arrays that the browser flattens
+    back into rows, "csv" writes CSV, and "inline" leaves the chart unchanged.
+    Files are named by content hash, so the spec URL changes only when the data
+    does and Streamlit's static handler serves them with ETags. Without
+    server.enableStaticServing the chart is left unchanged.
+    """
+    if transport == "inline" or not isinstance(chart.data, pd.DataFrame) or \
+            not st.get_option("server.enableStaticServing"):
+        return chart
+    
+    # Field types are inferred from a one-row probe, as they cannot be read from a URL
+    frame = chart.data
+    probe = chart.copy()
+    probe.data = frame.head(1)
+    spec = probe.to_dict()
+    spec.pop("datasets", None)
+    
+    if transport == "columnar":
+        columns = ",".join(
+            f"{json.dumps(str(col))}:{frame[col].to_json(orient='values', date_format='iso')}"
+            for col in frame.columns
+        )
+        url = _write_chart_data(f"[{{{columns}}}]", "json")
+        spec["data"] = {"url": url, "format": {"type": "json"}}
+        # Flatten zips the column arrays back into one row per index
+        spec["transform"] = [{"flatten": [str(col) for col in frame.columns]}] + spec.get("transform", [])
+    elif transport == "csv":
+        url = _write_chart_data(frame.to_csv(index=False), "csv")
+        spec["data"] = {"url": url, "format": {"type": "csv"}}
+    else:
+        raise ValueError(f"Unknown chart data transport: {transport}")
+    
+    return type(chart).from_dict(spec)
+
+def _chart_data(data, columns):
+    """Keep only the columns a chart encodes so each embedded copy stays small."""
+    return data[list(dict.fromkeys(columns))]
+
+def _series_data(data, x_col, y_col, max_points, width):
+    """
+    Project a single series and downsample it to the chart's point budget.
+    Returns the data and tooltip list; downsampled points show their bucket range.
+    """
+    series = _chart_data(data, [x_col, y_col])
+    tooltip = [x_col, y_col]
+    
+    if max_points == "auto":
+        max_points = point_budget(width)
+    if max_points and len(series) > max_points:
+        series = downsample_series(series.sort_values(x_col), x_col, y_col, max_points)
+        tooltip += [alt.Tooltip("Bucket_Start", title="From"), alt.Tooltip("Bucket_End", title="To")]
+    
+    return series, tooltip
+
+def stack_charts(charts, title=""):
+    """
+    Stack charts vertically in a single element.
+    Charts built from the same DataFrame rows are merged into one named
+    top-level dataset that every view references, so it is embedded only once
+    instead of once per chart.
+    """
+    frames = [chart.data for chart in charts]
+    if all(isinstance(frame, pd.DataFrame) for frame in frames) and \
+            all(frame.index.equals(frames[0].index) for frame in frames):
+        shared = frames[0]
+        for frame in frames[1:]:
+            overlap = [col for col in frame.columns if col in shared.columns]
+            if not all(frame[col].equals(shared[col]) for col in overlap):
+                break
+            shared = pd.concat([shared, frame.drop(columns=overlap)], axis=1)
+        else:
+            views = []
+            for chart in charts:
+                view = chart.copy()
+                view.data = alt.Undefined
+                views.append(view)
+            return alt.vconcat(*views, data=shared, title=title)
+    
+    return alt.vconcat(*charts, title=title)
+
+def create_line_chart(data, x_col, y_col, title, color=THEME_MARK_COLOR, point=True, max_points="auto", width=None):
+    """
+    Create an interactive line chart using Altair.
+    Series longer than max_points ("auto" derives it from width) are
+    downsampled with LTTB; pass max_points=None to plot every row.
+    """
+    series, tooltip = _series_data(data, x_col, y_col, max_points, width)
+    
+    chart = alt.Chart(series).mark_line(point=point, color=_mark_color(color)).encode(
         x=alt.X(f"{x_col}:O", title=x_col),
         y=alt.Y(f"{y_col}:Q", title=y_col),
-        tooltip=[x_col, y_col]
+        tooltip=tooltip
     ).properties(
         title=title
     ).interactive()
     
-    if color:
-        chart = chart.configure_mark(color=color)
+    if width:
+        chart = chart.properties(width=width)
     
     return chart
 
-def create_multi_line_chart(data, x_col, y_cols, title, colors=None):
-    """Create a multi-line chart with multiple y variables."""
-    if not colors:
-        colors = ["#3498db", "#e74c3c", "#2ecc71", "#f39c12", "#9b59b6"]
+def create_multi_line_chart(data, x_col, y_cols, title, colors=None, toggle=False, y_scale="shared"):
+    """
+    Create a multi-line chart with multiple y variables.
+    With toggle=True every metric is shipped once and clicking a legend entry
+    shows or hides lines in the browser without a rerun. y_scale is "shared",
+    "normalized" (each metric divided by its own maximum) or "independent"
+    (one row per metric with its own y axis). Lines take the theme's
+    category colors unless colors is given.
+    """
     
-    # Melt the dataframe to get it in the right format for Altair
-    id_vars = [x_col]
-    melted_df = pd.melt(data, id_vars=id_vars, value_vars=y_cols, 
-                        var_name='Metric', value_name='Value')
+    # Fold in the browser, so the embedded data is the same wide columns the single-metric charts use
+    wide = _chart_data(data, [x_col] + list(y_cols))
+    independent = y_scale == "independent"
+    # A facet splits its data before the inner transforms, so independent rows fold at the facet level
+    chart = alt.Chart() if independent else alt.Chart(wide).transform_fold(list(y_cols), as_=["Metric", "Value"])
+    y_field = "Value"
+    y_axis = alt.Axis(title="Value")
+    
+    # Normalize in the browser so the shipped data stays the raw values
+    if y_scale == "normalized":
+        chart = chart.transform_joinaggregate(
+            Metric_Max="max(Value)", groupby=["Metric"]
+        ).transform_calculate(
+            Normalized="datum.Value / datum.Metric_Max"
+        )
+        y_field = "Normalized"
+        y_axis = alt.Axis(title="Share of Metric Maximum", format="%")
     
     # Create the chart
-    chart = alt.Chart(melted_df).mark_line(point=True).encode(
+    chart = chart.mark_line(point=True).encode(
         x=alt.X(f"{x_col}:O", title=x_col),
-        y=alt.Y("Value:Q", title="Value"),
-        color=alt.Color("Metric:N", scale=alt.Scale(range=colors[:len(y_cols)])),
-        tooltip=[x_col, "Metric", "Value"]
-    ).properties(
-        title=title
-    ).interactive()
+        y=alt.Y(f"{y_field}:Q", axis=y_axis),
+        color=alt.Color("Metric:N", scale=alt.Scale(range=colors[:len(y_cols)]) if colors else alt.Undefined),
+        tooltip=[x_col, "Metric:N", "Value:Q"]
+    )
+    
+    # Legend-bound selection toggles metric visibility client-side
+    if toggle:
+        metric_selection = alt.selection_point(fields=["Metric"], bind="legend")
+        chart = chart.encode(
+            opacity=alt.condition(metric_selection, alt.value(1), alt.value(0.1))
+        ).add_params(metric_selection)
+    
+    if independent:
+        chart = chart.properties(height=150).interactive().facet(
+            row=alt.Row("Metric:N", title=None),
+            data=wide,
+            title=title
+        ).transform_fold(list(y_cols), as_=["Metric", "Value"]).resolve_scale(y="independent")
+    else:
+        chart = chart.properties(title=title).interactive()
     
     return chart
 
-def create_bar_chart(data, x_col, y_col, title, color="#3498db", sort=True):
+def create_bar_chart(data, x_col, y_col, title, color=THEME_MARK_COLOR, sort=True):
     """Create an interactive bar chart using Altair."""
     if sort:
         sort_order = alt.SortField(field=y_col, order="descending")
     else:
         sort_order = None
     
-    chart = alt.Chart(data).mark_bar().encode(
+    chart = alt.Chart(_chart_data(data, [x_col, y_col])).mark_bar(color=_mark_color(color)).encode(
         x=alt.X(f"{x_col}:N", title=x_col, sort=sort_order),
         y=alt.Y(f"{y_col}:Q", title=y_col),
         tooltip=[x_col, y_col]
@@ -60,14 +286,11 @@ def create_bar_chart(data, x_col, y_col, title, color="#3498db", sort=True):
         title=title
     ).interactive()
     
-    if color:
-        chart = chart.configure_mark(color=color)
-    
     return chart
 
 def create_stacked_bar_chart(data, x_col, y_col, color_col, title):
     """Create a stacked bar chart."""
-    chart = alt.Chart(data).mark_bar().encode(
+    chart = alt.Chart(_chart_data(data, [x_col, y_col, color_col])).mark_bar().encode(
         x=alt.X(f"{x_col}:N", title=x_col),
         y=alt.Y(f"{y_col}:Q", title=y_col),
         color=alt.Color(f"{color_col}:N"),
@@ -78,17 +301,24 @@ def create_stacked_bar_chart(data, x_col, y_col, color_col, title):
     
     return chart
 
-def create_heatmap(data, x_col, y_col, value_col, title):
-    """Create a heatmap using Altair."""
-    chart = alt.Chart(data).mark_rect().encode(
+def create_heatmap(data, x_col, y_col, value_col, title, aggregate="mean", pretransform=False):
+    """
+    Create a heatmap using Altair.
+    Rows sharing a cell are combined with `aggregate`; with pretransform=True
+    that happens in pandas so only one row per cell is shipped.
+    """
+    chart = alt.Chart(_chart_data(data, [x_col, y_col, value_col])).mark_rect().encode(
         x=alt.X(f"{x_col}:O", title=x_col),
         y=alt.Y(f"{y_col}:O", title=y_col),
-        color=alt.Color(f"{value_col}:Q", scale=alt.Scale(scheme="blues")),
-        tooltip=[x_col, y_col, value_col]
+        color=alt.Color(f"{aggregate}({value_col}):Q", title=value_col, scale=alt.Scale(scheme="blues")),
+        tooltip=[x_col, y_col, alt.Tooltip(f"{aggregate}({value_col}):Q", title=value_col)]
     ).properties(
         title=title
     ).interactive()
     
+    if pretransform:
+        chart = pretransform_chart(chart)
+    
     return chart
 
 def create_pie_chart(data, names_col, values_col, title):
@@ -180,9 +410,118 @@ def create_interactive_map(df, lat_col, lon_col, popup_cols, title, zoom_start=4
     
     return m
 
-def create_area_chart(data, x_col, y_col, title, color="#3498db"):
-    """Create an area chart using Altair."""
-    chart = alt.Chart(data).mark_area(
+def render_map(m, key, events=("last_object_clicked",), width=1000, height=500):
+    """
+    Render a folium map and return only the subscribed events.
+    Unsubscribed changes such as pan and zoom never trigger a rerun. Reruns
+    caused by the map are counted in st.session_state[f"{key}_reruns"].
+    """
+    events_key = f"{key}_events"
+    reruns_key = f"{key}_reruns"
+    
+    result = st_folium(m, key=key, width=width, height=height, returned_objects=list(events))
+    current = {event: (result or {}).get(event) for event in events}
+    previous = st.session_state.get(events_key)
+    
+    if previous is None:
+        st.session_state[reruns_key] = 0
+    elif current != previous:
+        # The map only changes its value when it caused this rerun
+        st.session_state[reruns_key] += 1
+    
+    st.session_state[events_key] = current
+    return current
+
+def create_linked_state_views(data, state_col, lat_col, lon_col, metrics, title, top_n=10):
+    """
+    Create a linked map, comparison and ranking view from one dataset.
+    Clicking states on the map or the comparison chart (shift-click for several)
+    highlights them everywhere and filters the rankings; dragging across the
+    comparison chart brushes a value range. The metric dropdown and all
+    selections are evaluated in the browser, so exploring needs no reruns.
+    """
+    metric = alt.param(
+        name="metric",
+        value=metrics[0],
+        bind=alt.binding_select(options=metrics, name="Metric: ")
+    )
+    picked = alt.selection_point(name="picked", fields=[state_col])
+    value_range = alt.selection_interval(name="value_range", encodings=["x"])
+    highlight = alt.condition(picked & value_range, alt.value("#3498db"), alt.value("#d5dbdb"))
+    
+    # Every view derives from this base so the data is embedded once
+    base = alt.Chart(data).transform_fold(
+        metrics, as_=["Metric", "Value"]
+    ).transform_filter(
+        "datum.Metric == metric"
+    )
+    tooltip = [f"{state_col}:N", "Metric:N", "Value:Q"]
+    
+    # State outlines come from a URL, not from the embedded data
+    outline = alt.Chart(
+        alt.topo_feature("https://cdn.jsdelivr.net/npm/vega-datasets@v1.29.0/data/us-10m.json", "states")
+    ).mark_geoshape(fill="#f5f7f9", stroke="white")
+    
+    points = base.mark_circle(opacity=0.8, stroke="white").encode(
+        longitude=f"{lon_col}:Q",
+        latitude=f"{lat_col}:Q",
+        size=alt.Size("Value:Q", legend=None, scale=alt.Scale(range=[50, 1000])),
+        color=highlight,
+        tooltip=tooltip
+    ).add_params(picked)
+    
+    state_map = alt.layer(outline, points).project(
+        type="albersUsa"
+    ).properties(
+        width=500,
+        height=320,
+        title="Click a state (shift-click to add more)"
+    )
+    
+    comparison = base.mark_bar().encode(
+        x=alt.X("Value:Q", title=None),
+        y=alt.Y(f"{state_col}:N", title=None, sort="-x"),
+        color=highlight,
+        tooltip=tooltip
+    ).properties(
+        width=300,
+        title="All States (drag to brush a range)"
+    ).add_params(picked, value_range)
+    
+    rankings = base.transform_filter(
+        picked
+    ).transform_filter(
+        value_range
+    ).transform_window(
+        Rank="rank()",
+        sort=[alt.SortField("Value", order="descending")]
+    ).transform_filter(
+        f"datum.Rank <= {top_n}"
+    ).mark_bar(color="#2ecc71").encode(
+        x=alt.X("Value:Q", title=None),
+        y=alt.Y(f"{state_col}:N", title=None, sort="-x"),
+        tooltip=["Rank:O"] + tooltip
+    ).properties(
+        width=820,
+        title=f"Top {top_n} States in Selection"
+    )
+    
+    chart = alt.vconcat(
+        alt.hconcat(state_map, comparison),
+        rankings,
+        title=title
+    ).add_params(metric)
+    
+    return chart
+
+def create_area_chart(data, x_col, y_col, title, color=THEME_MARK_COLOR, max_points="auto", width=None):
+    """
+    Create an area chart using Altair.
+    Long series are downsampled with LTTB as in create_line_chart.
+    """
+    series, tooltip = _series_data(data, x_col, y_col, max_points, width)
+    
+    chart = alt.Chart(series).mark_area(
         line={'color': color},
         color=alt.Gradient(
             gradient='linear',
@@ -196,15 +535,22 @@ def create_area_chart(data, x_col, y_col, title, color="#3498db"):
     ).encode(
         x=alt.X(f"{x_col}:O", title=x_col),
         y=alt.Y(f"{y_col}:Q", title=y_col),
-        tooltip=[x_col, y_col]
+        tooltip=tooltip
     ).properties(
         title=title
     ).interactive()
     
+    if width:
+        chart = chart.properties(width=width)
+    
     return chart
 
-def create_stacked_area_chart(data, x_col, y_cols, color_col, title):
-    """Create a stacked area chart for multiple metrics."""
+def create_stacked_area_chart(data, x_col, y_cols, color_col, title, pretransform=False):
+    """
+    Create a stacked area chart for multiple metrics.
+    Values are summed per x and metric; with pretransform=True the sum is
+    computed in pandas so only one row per mark is shipped.
+    """
     # Melt the dataframe for Altair
     id_vars = [x_col]
     melted_df = pd.melt(data, id_vars=id_vars, value_vars=y_cols, 
@@ -213,18 +559,52 @@ def create_stacked_area_chart(data, x_col, y_cols, color_col, title):
     # Create the chart
     chart = alt.Chart(melted_df).mark_area().encode(
         x=alt.X(f"{x_col}:O", title=x_col),
-        y=alt.Y("Value:Q", title="Value", stack=True),
+        y=alt.Y("sum(Value):Q", title="Value", stack=True),
         color=alt.Color(f"{color_col}:N"),
-        tooltip=[x_col, color_col, "Value"]
+        tooltip=[x_col, color_col, alt.Tooltip("sum(Value):Q", title="Value")]
     ).properties(
         title=title
     ).interactive()
     
+    if pretransform:
+        chart = pretransform_chart(chart)
+    
+    return chart
+
+def create_small_multiples(data, x_col, y_col, facet_col, title, mark="line", columns=6, sort_by=None,
+                           color=THEME_MARK_COLOR, width=120, height=80):
+    """
+    Create a single faceted chart with one small panel per facet value.
+    Expects long-form data (one row per facet value and x). All panels share
+    scales and one embedded dataset. sort_by orders panels by a summary of
+    y_col such as "mean", "max" or "sum", largest first.
+    """
+    if sort_by:
+        facet_sort = alt.EncodingSortField(field=y_col, op=sort_by, order="descending")
+    else:
+        facet_sort = "ascending"
+    
+    x_type = "N" if mark == "bar" else "O"
+    
+    chart = alt.Chart(_chart_data(data, [facet_col, x_col, y_col]))
+    chart = getattr(chart, f"mark_{mark}")(color=_mark_color(color)).encode(
+        x=alt.X(f"{x_col}:{x_type}", title=None),
+        y=alt.Y(f"{y_col}:Q", title=None),
+        tooltip=[facet_col, x_col, y_col]
+    ).properties(
+        width=width,
+        height=height
+    ).facet(
+        facet=alt.Facet(f"{facet_col}:N", sort=facet_sort, title=None),
+        columns=columns,
+        title=title
+    )
+    
     return chart
 
 def create_bubble_chart(data, x_col, y_col, size_col, color_col, title):
     """Create a bubble chart with Altair."""
-    chart = alt.Chart(data).mark_circle(opacity=0.7).encode(
+    chart = alt.Chart(_chart_data(data, [x_col, y_col, size_col, color_col])).mark_circle(opacity=0.7).encode(
         x=alt.X(f"{x_col}:Q", title=x_col),
         y=alt.Y(f"{y_col}:Q", title=y_col),
         size=alt.Size(f"{size_col}:Q", scale=alt.Scale(range=[100, 2000])),
@@ -286,7 +666,7 @@ def create_comparison_chart(data, category_col, value_col, compare_col, title):
     For example, comparing victim rates across different demographics.
     """
     # Sort the data based on the value column
-    sorted_data = data.sort_values(by=value_col)
+    sorted_data = _chart_data(data, [category_col, value_col, compare_col]).sort_values(by=value_col)
     
     chart = alt.Chart(sorted_data).mark_bar().encode(
         x=alt.X(f"{value_col}:Q", title=value_col),
@@ -299,24 +679,44 @@ def create_comparison_chart(data, category_col, value_col, compare_col, title):
     
     return chart
 
-def create_waffle_chart(value, max_value, title, rows=10, cols=10, icon="▣"):
-    """Create a waffle chart to visually represent proportions."""
+def create_waffle_chart(value, max_value, title, rows=10, cols=10, icon="▣", renderer="svg"):
+    """
+    Create a waffle chart to visually represent proportions.
+    The "svg" renderer draws the cells with SVG patterns, so the markup is
+    the same size for any rows x cols; "html" emits one <div> per cell.
+    """
     # Calculate how many squares to fill
     total_squares = rows * cols
     filled_squares = int(round(total_squares * (value / max_value)))
     
-    # Create HTML for the waffle chart
-    waffle_html = f"<h4>{title}: {value}/{max_value} ({value/max_value:.1%})</h4>"
-    waffle_html += "<div style='display: grid; grid-template-columns: repeat({}, 1fr); gap: 2px; width: 100%;'>".format(cols)
-    
-    for i in range(total_squares):
-        if i < filled_squares:
-            # Filled square
-            waffle_html += f"<div style='aspect-ratio: 1; background-color: #3498db; display: flex; align-items: center; justify-content: center; color: white;'>{icon}</div>"
-        else:
-            # Empty square
-            waffle_html += f"<div style='aspect-ratio: 1; background-color: #eaecee; display: flex; align-items: center; justify-content: center; color: #bdc3c7;'>{icon}</div>"
+    if renderer == "svg":
+        filled_cell = WAFFLE_SVG_CELL.render(fill="#3498db", text="white", icon=icon)
+        empty_cell = WAFFLE_SVG_CELL.render(fill="#eaecee", text="#bdc3c7", icon=icon)
+        # Identical cells share a pattern id, so several waffles on one page never conflict
+        pattern_id = "waffle-" + hashlib.md5(icon.encode("utf-8")).hexdigest()[:8]
+        return WAFFLE_SVG.render(
+            title=title,
+            value=value,
+            max_value=max_value,
+            share=value / max_value,
+            rows=rows,
+            cols=cols,
+            pattern_id=pattern_id,
+            filled_cell=filled_cell,
+            empty_cell=empty_cell,
+            full_rows=filled_squares // cols,
+            partial_cells=filled_squares % cols
+        )
     
-    waffle_html += "</div>"
+    header = WAFFLE_HEADER.render(
+        title=title,
+        value=value,
+        max_value=max_value,
+        share=value / max_value,
+        cols=cols
+    )
     
-    return waffle_html
\ No newline at end of file
+    # Each kind of square is rendered once and repeated, and the whole chart is built in one join
+    filled = WAFFLE_FILLED.render(icon=icon)
+    empty = WAFFLE_EMPTY.render(icon=icon)
+    return Markup("".join([header, filled * filled_squares, empty * (total_squares - filled_squares), "</div>"]))
@@ -0,0 +1,74 @@
+import pandas as pd
+import numpy as np
+
+# Charts are assumed this wide when no width is given, e.g. with use_container_width
+DEFAULT_CHART_WIDTH = 800
+
+def point_budget(width=None, pixels_per_point=2):
+    """Number of points worth drawing across a chart of the given pixel width."""
+    return max(3, int((width or DEFAULT_CHART_WIDTH) / pixels_per_point))
+
+def lttb(x, y, n_out):
+    """
+    Select n_out points with Largest-Triangle-Three-Buckets.
+    Returns the kept indices together with the first and last index of the
+    bucket each kept point stands for. Bucket boundaries and the averages
+    used as the third triangle corner are computed in one pass; only the
+    per-bucket argmax, which depends on the previous pick, loops in Python.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        index = np.arange(n)
+        return index, index, index
+
+    # First and last points are kept; the rest are split into n_out - 2 buckets
+    edges = (np.arange(n_out - 1) * ((n - 2) / (n_out - 2))).astype(int) + 1
+    edges[-1] = n - 1
+    counts = np.diff(edges)
+
+    # Mean of every bucket via cumulative sums; the last bucket looks ahead to the final point
+    cx = np.concatenate([[0.0], np.cumsum(x)])
+    cy = np.concatenate([[0.0], np.cumsum(y)])
+    next_x = np.append((cx[edges[2:]] - cx[edges[1:-1]]) / counts[1:], x[-1])
+    next_y = np.append((cy[edges[2:]] - cy[edges[1:-1]]) / counts[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for j in range(n_out - 2):
+        lo, hi = edges[j], edges[j + 1]
+        area = np.abs(
+            (x[a] - next_x[j]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y[j] - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        selected[j + 1] = a
+
+    bucket_start = np.concatenate([[0], edges[:-1], [n - 1]])
+    bucket_end = np.concatenate([[0], edges[1:] - 1, [n - 1]])
+    return selected, bucket_start, bucket_end
+
+def downsample_series(data, x_col, y_col, max_points):
+    """
+    Reduce a single series to at most max_points rows with LTTB.
+    Rows must be in x order. The result carries Bucket_Start and Bucket_End
+    columns with the x range each kept point represents, for tooltips.
+    Non-numeric x values are spaced by position.
+    """
+    if len(data) <= max_points:
+        return data
+
+    x = data[x_col]
+    if pd.api.types.is_datetime64_any_dtype(x):
+        x_values = x.astype("int64").to_numpy()
+    elif pd.api.types.is_numeric_dtype(x):
+        x_values = x.to_numpy()
+    else:
+        x_values = np.arange(len(data))
+
+    selected, bucket_start, bucket_end = lttb(x_values, data[y_col].to_numpy(), max_points)
+    result = data.iloc[selected].copy()
+    result["Bucket_Start"] = x.iloc[bucket_start].to_numpy()
+    result["Bucket_End"] = x.iloc[bucket_end].to_numpy()
+    return result
@@ -0,0 +1,222 @@
+import streamlit as st
+import numpy as np
+import heapq
+import json
+import math
+import os
+
+# Geometry files are bundled with the app so lookups never need the network
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 110.57
+KM_PER_DEGREE_LON_AT_EQUATOR = 111.32
+
+def _ring_edges(coords):
+    """Precompute the edge arrays used by the ray-casting test for one ring."""
+    ring = np.asarray(coords, dtype=float)
+    x1, y1 = ring[:, 0], ring[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    dy = y2 - y1
+    # Horizontal edges never cross the ray, so their slope is irrelevant
+    slope = np.divide(x2 - x1, dy, out=np.zeros_like(dy), where=dy != 0)
+    return x1, y1, y2, slope
+
+def _in_ring(edges, lon, lat):
+    """Even-odd ray-casting test of a point against a ring."""
+    x1, y1, y2, slope = edges
+    crosses = ((y1 > lat) != (y2 > lat)) & (lon < x1 + (lat - y1) * slope)
+    return bool(np.count_nonzero(crosses) % 2)
+
+class RegionIndex:
+    """
+    Resolve a coordinate to the GeoJSON region that contains it.
+    Polygon bounding boxes are bucketed into a regular lon/lat grid when the
+    index is built, so a lookup only runs exact point-in-polygon tests on the
+    few polygons whose boxes overlap the point's grid cell. Works for any
+    FeatureCollection of Polygon/MultiPolygon features, e.g. states or counties.
+    """
+
+    def __init__(self, geojson, name_property="name", cell_size=1.0):
+        self.cell_size = cell_size
+        self.names = []
+        self.polygons = []  # (region index, bbox, exterior edges, hole edges)
+        self.grid = {}
+
+        for feature in geojson["features"]:
+            geometry = feature["geometry"]
+            if geometry["type"] == "Polygon":
+                parts = [geometry["coordinates"]]
+            elif geometry["type"] == "MultiPolygon":
+                parts = geometry["coordinates"]
+            else:
+                continue
+
+            region = len(self.names)
+            self.names.append(feature["properties"][name_property])
+
+            for rings in parts:
+                exterior = np.asarray(rings[0], dtype=float)
+                bbox = (exterior[:, 0].min(), exterior[:, 1].min(),
+                        exterior[:, 0].max(), exterior[:, 1].max())
+                self._add_to_grid(len(self.polygons), bbox)
+                self.polygons.append((
+                    region,
+                    bbox,
+                    _ring_edges(rings[0]),
+                    [_ring_edges(hole) for hole in rings[1:]]
+                ))
+
+    def _cell(self, lon, lat):
+        return (math.floor(lon / self.cell_size), math.floor(lat / self.cell_size))
+
+    def _add_to_grid(self, polygon_id, bbox):
+        min_x, min_y = self._cell(bbox[0], bbox[1])
+        max_x, max_y = self._cell(bbox[2], bbox[3])
+        for cx in range(min_x, max_x + 1):
+            for cy in range(min_y, max_y + 1):
+                self.grid.setdefault((cx, cy), []).append(polygon_id)
+
+    def center(self, name):
+        """
+        (lat, lon) centroid of the largest polygon of a region, e.g. to stand in
+        for a location when only the state is known.
+        """
+        best = None
+        for region, bbox, exterior, holes in self.polygons:
+            if self.names[region] != name:
+                continue
+            x, y = exterior[0], exterior[1]
+            x2, y2 = np.roll(x, -1), np.roll(y, -1)
+            cross = x * y2 - x2 * y
+            area = cross.sum() / 2
+            if area and (best is None or abs(area) > abs(best[0])):
+                best = (area, ((y + y2) * cross).sum() / (6 * area), ((x + x2) * cross).sum() / (6 * area))
+        return None if best is None else (best[1], best[2])
+
+    def lookup(self, lat, lon):
+        """Return the name of the region containing the point, or None."""
+        for polygon_id in self.grid.get(self._cell(lon, lat), ()):
+            region, bbox, exterior, holes = self.polygons[polygon_id]
+            if not (bbox[0] <= lon <= bbox[2] and bbox[1] <= lat <= bbox[3]):
+                continue
+            if _in_ring(exterior, lon, lat) and not any(_in_ring(hole, lon, lat) for hole in holes):
+                return self.names[region]
+        return None
+
+@st.cache_resource(show_spinner=False)
+def get_region_index(filename="us_states.geojson", name_property="name"):
+    """
+    Build the RegionIndex for a GeoJSON file in the data directory once per process.
+    County polygons can be indexed the same way by passing their file and name property.
+    """
+    with open(os.path.join(DATA_DIR, filename)) as f:
+        geojson = json.load(f)
+    return RegionIndex(geojson, name_property=name_property)
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in kilometres; the second point may be arrays."""
+    lat1, lon1 = np.radians(lat1), np.radians(lon1)
+    lat2, lon2 = np.radians(lat2), np.radians(lon2)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+class PointIndex:
+    """
+    Uniform lat/lon grid over points for nearest and within-radius queries.
+    A query only visits the cells around its location, so its cost depends
+    on how many points are nearby rather than on the size of the directory.
+    Cells are square in degrees; the search extent accounts for meridians
+    converging away from the equator, and final distances are great-circle.
+    """
+
+    def __init__(self, lats, lons, ids=None, cell_km=25.0):
+        self.lats = np.asarray(lats, dtype=float)
+        self.lons = np.asarray(lons, dtype=float)
+        self.ids = list(range(len(self.lats))) if ids is None else list(ids)
+        self.cell_deg = cell_km / KM_PER_DEGREE_LAT
+        self.grid = {}
+        for i, (lat, lon) in enumerate(zip(self.lats, self.lons)):
+            self.grid.setdefault(self._cell(lat, lon), []).append(i)
+        cells = np.array(list(self.grid)) if self.grid else np.zeros((0, 2), dtype=int)
+        self.cell_bounds = (cells.min(axis=0), cells.max(axis=0)) if len(cells) else None
+
+    def __len__(self):
+        return len(self.lats)
+
+    def _cell(self, lat, lon):
+        return (math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg))
+
+    def _lon_km(self, lat):
+        """Kilometres per degree of longitude at a latitude, floored near the poles."""
+        return KM_PER_DEGREE_LON_AT_EQUATOR * max(math.cos(math.radians(min(abs(lat), 89.0))), 0.01)
+
+    def _ranked(self, lat, lon, candidates, predicate):
+        """(id, km) pairs for the candidates that pass predicate, nearest first."""
+        if predicate is not None:
+            candidates = [i for i in candidates if predicate(self.ids[i])]
+        if not candidates:
+            return []
+        candidates = np.asarray(candidates)
+        distances = haversine_km(lat, lon, self.lats[candidates], self.lons[candidates])
+        order = np.argsort(distances, kind="stable")
+        return [(self.ids[candidates[j]], float(distances[j])) for j in order]
+
+    def within(self, lat, lon, radius_km, predicate=None):
+        """(id, km) pairs for every point within radius_km, nearest first."""
+        lat_span = radius_km / KM_PER_DEGREE_LAT
+        lon_span = radius_km / self._lon_km(abs(lat) + lat_span)
+        min_x, min_y = self._cell(lat - lat_span, lon - lon_span)
+        max_x, max_y = self._cell(lat + lat_span, lon + lon_span)
+        candidates = []
+        for cx in range(min_x, max_x + 1):
+            for cy in range(min_y, max_y + 1):
+                candidates.extend(self.grid.get((cx, cy), ()))
+        return [(i, d) for i, d in self._ranked(lat, lon, candidates, predicate) if d <= radius_km]
+
+    def nearest(self, lat, lon, k=10, predicate=None):
+        """
+        The k nearest (id, km) pairs that pass predicate. Rings of cells are
+        visited outward until k matches are closer than any unvisited cell.
+        Each point is tested and measured once, when its ring is visited,
+        and the k best so far are kept in a heap.
+        """
+        if self.cell_bounds is None or k <= 0:
+            return []
+        center = self._cell(lat, lon)
+        low, high = self.cell_bounds
+        max_ring = int(max(abs(center[0] - low[0]), abs(center[0] - high[0]),
+                           abs(center[1] - low[1]), abs(center[1] - high[1])))
+        # Max-heap of (-km, -visit order, id); on equal distances the earlier visit is kept
+        best = []
+        visited = 0
+        for ring in range(max_ring + 1):
+            cx0, cy0 = center[0] - ring, center[1] - ring
+            side = 2 * ring + 1
+            if ring == 0:
+                cells = [center]
+            else:
+                # Top and bottom rows, then the left and right columns between them
+                cells = [(cx0 + i, cy) for i in range(side) for cy in (cy0, cy0 + side - 1)]
+                cells += [(cx, cy0 + j) for j in range(1, side - 1) for cx in (cx0, cx0 + side - 1)]
+            candidates = [i for cell in cells for i in self.grid.get(cell, ())]
+            if predicate is not None:
+                candidates = [i for i in candidates if predicate(self.ids[i])]
+            if candidates:
+                candidates = np.asarray(candidates)
+                distances = haversine_km(lat, lon, self.lats[candidates], self.lons[candidates])
+                for i, km in zip(candidates.tolist(), distances.tolist()):
+                    item = (-km, -visited, i)
+                    visited += 1
+                    if len(best) < k:
+                        heapq.heappush(best, item)
+                    elif item > best[0]:
+                        heapq.heapreplace(best, item)
+            if len(best) < k:
+                continue
+            # Every point closer than this distance lies inside the rings visited so far
+            reach_deg = ring * self.cell_deg
+            covered_km = reach_deg * min(KM_PER_DEGREE_LAT, self._lon_km(abs(lat) + reach_deg + self.cell_deg))
+            if -best[0][0] <= covered_km:
+                break
+        return [(self.ids[i], -km) for km, _, i in sorted(best, reverse=True)]
@@ -3,7 +3,124 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import random
+import math
+import re
+import hashlib
 from datetime import datetime
+from utils.templates import Template, Markup, EMPTY, escape, render_list
+from utils.stories import get_story_engine
+
+# Component templates are compiled once at import; fields are escaped unless passed as Markup.
+# Containers skip the fragment cache since their content is already rendered and rarely repeats.
+STORY_CONTAINER = Template("""
+<div class="story-container">
+    {heading}
+    {content}
+</div>
+""")
+STORY_HEADING = Template("<h4>{title}</h4>")
+STORY_PARAGRAPH = Template("<p>{text}</p>")
+
+QUOTE_BOX = Template("""
+<blockquote class="survivor-quote">
+    "{quote}"
+    {author}
+    {role}
+</blockquote>
+""")
+QUOTE_AUTHOR = Template("<br><strong>— {author}</strong>")
+QUOTE_ROLE = Template("<br><em>{role}</em>")
+
+RESOURCE_CARD = Template("""
+<div class="resource-card">
+    <h4><a href="{url}" target="_blank">{name}</a></h4>
+    {badge}
+    <p>{description}</p>
+    {phone}
+</div>
+""")
+RESOURCE_BADGE = Template("<span style='background-color: #eaf2f8; padding: 3px 8px; border-radius: 10px; font-size: 0.8em;'>{resource_type}</span>")
+RESOURCE_PHONE = Template("<p><strong>Phone:</strong> {phone}</p>")
+
+STAT_HIGHLIGHT = Template('<span class="stat-highlight">{value}</span>')
+TOOLTIP = Template("""
+<div class="tooltip">{text}
+    <span class="tooltiptext">{tooltip_text}</span>
+</div>
+""")
+
+FACT_BOX = Template("""
+<div style="
+    border: 2px solid #3498db;
+    border-radius: 10px;
+    padding: 15px;
+    margin: 20px 0;
+    background-color: #eaf2f8;
+">
+    <h4 style="color: #2c3e50; margin-top: 0;">{title}</h4>
+    <p>{content}</p>
+</div>
+""")
+
+GRID = Template("""
+<div style="display: grid; grid-template-columns: repeat({columns}, minmax(0, 1fr)); column-gap: 1rem;">
+    {items}
+</div>
+""", cache_size=0)
+
+METRIC_CARD = Template("""
+<div class="metric-card">
+    <h3>{title}</h3>
+    <div class="metric-value">{value}</div>
+    {description}
+</div>
+""")
+METRIC_DESCRIPTION = Template('<div class="metric-description">{description}</div>')
+
+COMPARISON_BAR = Template("""
+<div style="margin-bottom: 10px;">
+    <div style="display: flex; align-items: center; margin-bottom: 5px;">
+        <div style="width: 150px; font-weight: bold;">{label}</div>
+        <div style="flex-grow: 1; margin: 0 10px;">
+            <div style="background-color: #eee; border-radius: 5px; height: 20px;">
+                <div style="width: {percent}%; background-color: {color}; height: 20px; border-radius: 5px;"></div>
+            </div>
+        </div>
+        <div style="width: 50px; text-align: right;">{value}</div>
+    </div>
+</div>
+""")
+PANEL_TITLE = Template("<h3>{title}</h3>")
+PANEL_HEADING = Template("<h4>{heading}</h4>")
+
+IMPACT_VISUALIZATION = Template("""
+<div style="text-align: center; margin: 20px 0; background-color: #f8f9fa; padding: 20px; border-radius: 10px;">
+    <h3>{title}</h3>
+    <div style="font-size: 1.2rem; letter-spacing: 5px; line-height: 1.5; margin: 15px 0;">
+        {icons}
+    </div>
+    <p><strong>{number:,}</strong> {description}</p>
+</div>
+""")
+
+# Unit chart: one symbol drawn by <use> per icon, the last one clipped to its fraction
+UNIT_CHART = Template("""
+<div style="text-align: center; margin: 20px 0; background-color: #f8f9fa; padding: 20px; border-radius: 10px;">
+    <h3>{title}</h3>
+    <svg viewBox="0 0 {cols} {rows}" width="100%" style="max-width: {max_width}px; margin: 15px 0;" role="img" aria-label="{number:,} {unit_label}">
+        <defs>
+            <symbol id="{symbol_id}" viewBox="0 0 1 1"><text x="0.5" y="0.8" font-size="0.8" text-anchor="middle" textLength="0.9" lengthAdjust="spacingAndGlyphs">{icon}</text></symbol>
+            {clip}
+        </defs>
+        {uses}
+    </svg>
+    <p><strong>{number:,}</strong> {description}</p>
+    <p><em>Each icon represents {unit:,} {unit_label}</em></p>
+</div>
+""", cache_size=0)
+UNIT_USE = Template('<use href="#{symbol_id}" x="{x}" y="{y}" width="1" height="1"/>')
+UNIT_CLIP = Template('<clipPath id="{clip_id}"><rect x="{x}" y="{y}" width="{width}" height="1"/></clipPath>')
+UNIT_CLIPPED = Template('<g clip-path="url(#{clip_id})">{use}</g>')
 
 def load_css():
     """
@@ -151,132 +268,145 @@ def format_large_number(num):
     return "{:,}".format(num)
 
 def create_story_container(content, title=None):
-    """Create a styled container for narrative elements."""
-    html = f"""
-    <div class="story-container">
-        {f"<h4>{title}</h4>" if title else ""}
-        {content}
-    </div>
     """
+    Create a styled container for narrative elements.
+    Plain-text content is split into paragraphs at blank lines; Markup is used as is.
+    """
+    if not isinstance(content, Markup):
+        paragraphs = [p for p in re.split(r"\n\s*\n", str(content)) if p.strip()]
+        content = render_list(STORY_PARAGRAPH, [{"text": p} for p in paragraphs])
+    html = STORY_CONTAINER.render(
+        heading=STORY_HEADING.render(title=title) if title else EMPTY,
+        content=content
+    )
     return st.markdown(html, unsafe_allow_html=True)
 
 def create_quote_box(quote, author=None, role=None):
     """Create a styled quote box."""
-    html = f"""
-    <blockquote class="survivor-quote">
-        "{quote}"
-        {f"<br><strong>— {author}</strong>" if author else ""}
-        {f"<br><em>{role}</em>" if role else ""}
-    </blockquote>
-    """
+    html = QUOTE_BOX.render(
+        quote=quote,
+        author=QUOTE_AUTHOR.render(author=author) if author else EMPTY,
+        role=QUOTE_ROLE.render(role=role) if role else EMPTY
+    )
     return st.markdown(html, unsafe_allow_html=True)
 
 def create_resource_card(name, description, url, resource_type=None, phone=None):
     """Create a styled resource card with link."""
-    html = f"""
-    <div class="resource-card">
-        <h4><a href="{url}" target="_blank">{name}</a></h4>
-        {f"<span style='background-color: #eaf2f8; padding: 3px 8px; border-radius: 10px; font-size: 0.8em;'>{resource_type}</span>" if resource_type else ""}
-        <p>{description}</p>
-        {f"<p><strong>Phone:</strong> {phone}</p>" if phone else ""}
-    </div>
-    """
+    html = _resource_card_html(name, description, url, resource_type, phone)
     return st.markdown(html, unsafe_allow_html=True)
 
+def _resource_card_html(name, description, url, resource_type=None, phone=None):
+    """HTML for one resource card."""
+    return RESOURCE_CARD.render(
+        name=name,
+        description=description,
+        url=url,
+        badge=RESOURCE_BADGE.render(resource_type=resource_type) if resource_type else EMPTY,
+        phone=RESOURCE_PHONE.render(phone=phone) if phone else EMPTY
+    )
+
+def create_resource_cards(resources):
+    """
+    Display a list of resource dicts (name, description, url, type and an
+    optional phone) as a single element built with one join.
+    """
+    return st.markdown(_resource_cards_html(resources), unsafe_allow_html=True)
+
+def _resource_cards_html(resources):
+    """HTML for a run of resource cards, built with one join."""
+    return Markup("".join([
+        _resource_card_html(r["name"], r["description"], r["url"], r.get("type"), r.get("phone"))
+        for r in resources
+    ]))
+
+def _set_page(page_key, page):
+    st.session_state[page_key] = page
+
+def create_resource_list(resources, key, page_size=20, reset_on=None):
+    """
+    Display a long list of resources one page at a time.
+    Only the visible page is rendered, as a single element, with previous
+    and next buttons and a count of the whole list. resources can be any
+    sequence supporting len() and slicing. The page goes back to the first
+    one whenever reset_on (e.g. the active query and filters) changes.
+    After the visible page is sent, the next page is rendered once to warm
+    the card cache so paging forward does not wait on templating.
+    """
+    page_key = f"{key}_page"
+    reset_key = f"{key}_reset_on"
+    if st.session_state.get(reset_key) != reset_on:
+        st.session_state[reset_key] = reset_on
+        st.session_state[page_key] = 0
+    
+    total = len(resources)
+    pages = max(1, math.ceil(total / page_size))
+    page = min(st.session_state.get(page_key, 0), pages - 1)
+    start, end = page * page_size, min((page + 1) * page_size, total)
+    
+    st.markdown(_resource_cards_html(resources[start:end]), unsafe_allow_html=True)
+    
+    if pages > 1:
+        col_prev, col_info, col_next = st.columns([1, 3, 1])
+        col_prev.button("← Previous", key=f"{key}_prev", disabled=page == 0,
+                        on_click=_set_page, args=(page_key, page - 1))
+        col_info.caption(f"Showing {start + 1:,}–{end:,} of {total:,} (page {page + 1} of {pages})")
+        col_next.button("Next →", key=f"{key}_next", disabled=page == pages - 1,
+                        on_click=_set_page, args=(page_key, page + 1))
+        # Prefetch: the fragments land in the template cache for the next rerun
+        _resource_cards_html(resources[end:end + page_size])
+    else:
+        st.caption(f"{total:,} resource{'s' if total != 1 else ''}")
+
 def highlight_stat(value, text=None):
     """Add highlighting to important statistics."""
     if text:
-        return f'<span class="stat-highlight">{value}</span> {text}'
+        return Markup(f"{STAT_HIGHLIGHT.render(value=value)} {escape(text)}")
     else:
-        return f'<span class="stat-highlight">{value}</span>'
+        return STAT_HIGHLIGHT.render(value=value)
 
 def create_tooltip(text, tooltip_text):
     """Create an inline tooltip for definitions or explanations."""
-    html = f"""
-    <div class="tooltip">{text}
-        <span class="tooltiptext">{tooltip_text}</span>
-    </div>
-    """
-    return html
+    return TOOLTIP.render(text=text, tooltip_text=tooltip_text)
 
-def generate_random_story(state=None, year=None):
+def generate_random_story(state=None, year=None, seed=None):
     """
-    Generate a semi-random narrative about a child maltreatment case for storytelling.
+    Generate a narrative about a child maltreatment case for storytelling.
+    Its details are drawn from the data for the state and year (see
+    StoryEngine). With a seed the story is fixed by seed, state and year;
+    without one it is drawn at random.
     For narrative/educational purposes only - not real cases.
     """
-    # Child profiles
-    profiles = [
-        {"name": "Alex", "age": "8", "gender": "male"},
-        {"name": "Emma", "age": "5", "gender": "female"},
-        {"name": "Jayden", "age": "3", "gender": "male"},
-        {"name": "Sophia", "age": "10", "gender": "female"},
-        {"name": "Miguel", "age": "7", "gender": "male"},
-        {"name": "Ava", "age": "2", "gender": "female"},
-        {"name": "Ethan", "age": "11", "gender": "male"},
-        {"name": "Zoe", "age": "6", "gender": "female"}
-    ]
-    
-    # Types of maltreatment
-    maltreatment_types = ["neglect", "physical abuse", "emotional abuse"]
-    
-    # Reporter types
-    reporters = ["teacher", "neighbor", "doctor", "relative", "coach"]
-    
-    # Intervention options
-    interventions = [
-        "family support services", 
-        "parenting classes", 
-        "substance abuse treatment", 
-        "mental health counseling",
-        "temporary removal and foster care placement"
-    ]
-    
-    # Outcomes
-    outcomes = [
-        "remained with family with supports in place",
-        "was temporarily placed with relatives",
-        "entered foster care but later reunified with family",
-        "was adopted by a loving family"
-    ]
-    
-    # Select random elements
-    profile = random.choice(profiles)
-    maltreatment = random.choice(maltreatment_types)
-    reporter = random.choice(reporters)
-    intervention = random.choice(interventions)
-    outcome = random.choice(outcomes)
-    
-    # Use provided state and year if available
-    state_text = f"in {state}" if state else "in one state"
-    year_text = f"In {year}" if year else "In recent years"
-    
-    # Construct the narrative
-    story = f"""
-    {year_text}, {profile['name']}, a {profile['age']}-year-old {profile['gender']} {state_text}, 
-    was identified as experiencing {maltreatment}. A concerned {reporter} noticed warning signs 
-    and reported the situation to child protective services. After investigation, 
-    {intervention} was provided to the family. Eventually, {profile['name']} {outcome}.
-    
-    This represents just one example of how data translates to real children's lives.
-    Each case is unique, but behind every statistic is a child like {profile['name']}.
-    """
-    
-    return story
+    if seed is None:
+        seed = random.getrandbits(32)
+    return get_story_engine().story(seed, state, year)
 
 def display_fact_box(title, content):
     """Display a styled fact box."""
-    st.markdown(f"""
-    <div style="
-        border: 2px solid #3498db;
-        border-radius: 10px;
-        padding: 15px;
-        margin: 20px 0;
-        background-color: #eaf2f8;
-    ">
-        <h4 style="color: #2c3e50; margin-top: 0;">{title}</h4>
-        <p>{content}</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(FACT_BOX.render(title=title, content=content), unsafe_allow_html=True)
+
+def display_fact_box_grid(facts, columns=2):
+    """
+    Display several fact boxes as a single element.
+    facts is a list of (title, content) pairs laid out row by row.
+    """
+    items = render_list(FACT_BOX, [{"title": title, "content": content} for title, content in facts])
+    st.markdown(GRID.render(columns=columns, items=items), unsafe_allow_html=True)
+
+def create_metric_card_grid(cards, columns=1):
+    """
+    Display metric cards as a single element.
+    Each card is a dict with title, value and an optional description.
+    """
+    items = render_list(METRIC_CARD, [
+        {
+            "title": card["title"],
+            "value": card["value"],
+            "description": METRIC_DESCRIPTION.render(description=card["description"])
+            if card.get("description") else EMPTY
+        }
+        for card in cards
+    ])
+    st.markdown(GRID.render(columns=columns, items=items), unsafe_allow_html=True)
     
 def show_success_message(message):
     """Show a consistent success message with animation."""
@@ -302,22 +432,26 @@ def combine_charts(chart1, chart2, title=""):
     combined = alt.hconcat(chart1, chart2, title=title)
     return combined
 
+def _comparison_bar_html(value, max_value, label, color="#3498db"):
+    """HTML for one horizontal comparison bar."""
+    percent = (value / max_value) * 100
+    return COMPARISON_BAR.render(label=label, percent=percent, color=color, value=value)
+
 def create_comparison_bar(value, max_value, label, color="#3498db"):
     """Create a horizontal comparison bar."""
-    percent = (value / max_value) * 100
-    st.markdown(f"""
-    <div style="margin-bottom: 10px;">
-        <div style="display: flex; align-items: center; margin-bottom: 5px;">
-            <div style="width: 150px; font-weight: bold;">{label}</div>
-            <div style="flex-grow: 1; margin: 0 10px;">
-                <div style="background-color: #eee; border-radius: 5px; height: 20px;">
-                    <div style="width: {percent}%; background-color: {color}; height: 20px; border-radius: 5px;"></div>
-                </div>
-            </div>
-            <div style="width: 50px; text-align: right;">{value}</div>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_comparison_bar_html(value, max_value, label, color), unsafe_allow_html=True)
+
+def create_comparison_panel(sections, title=None):
+    """
+    Display groups of comparison bars as a single element.
+    sections is a list of (heading, bars) pairs, where each bar is a
+    (value, max_value, label) or (value, max_value, label, color) tuple.
+    """
+    parts = [PANEL_TITLE.render(title=title)] if title else []
+    for heading, bars in sections:
+        parts.append(PANEL_HEADING.render(heading=heading))
+        parts.extend(_comparison_bar_html(*bar) for bar in bars)
+    st.markdown(Markup("\n".join(parts)), unsafe_allow_html=True)
 
 def animate_stat_reveal(key, base_value, final_value, prefix="", suffix="", duration=2.0):
     """Animate a statistic gradually increasing from base to final value."""
@@ -334,20 +468,89 @@ def animate_stat_reveal(key, base_value, final_value, prefix="", suffix="", dura
     
     return placeholder
 
-def create_impact_visualization(number, icon="👧", title="Children Affected", description=""):
-    """Create a visual representation of impact using icons."""
+def icon_unit(number, max_icons=100):
+    """
+    Smallest 1, 2 or 5 x 10^k count per icon that draws number in at most max_icons icons.
+    """
+    if number <= max_icons:
+        return 1
+    k = math.floor(math.log10(number / max_icons))
+    for step in (1, 2, 5, 10):
+        unit = step * 10 ** k
+        if math.ceil(number / unit) <= max_icons:
+            return unit
+
+def _unit_chart_html(number, icon, title, description, unit_label, max_icons=100, per_row=20):
+    """
+    HTML for a unit chart where each icon stands for icon_unit(number) units.
+    Icons are <use> references to one symbol, so the markup is bounded by
+    max_icons whatever the magnitude, and the last icon is clipped to the
+    fraction it represents.
+    """
+    unit = icon_unit(number, max_icons)
+    whole, fraction = divmod(number / unit, 1)
+    count = int(whole) + (1 if fraction else 0)
+    cols = min(per_row, max(count, 1))
+    rows = max(math.ceil(count / cols), 1)
+    symbol_id = "unit-" + hashlib.md5(icon.encode("utf-8")).hexdigest()[:8]
+    
+    positions = [{"symbol_id": symbol_id, "x": i % cols, "y": i // cols} for i in range(count)]
+    uses = render_list(UNIT_USE, positions[:int(whole)])
+    clip = EMPTY
+    if fraction:
+        # The clip wraps the last icon in a group so its rect is in the chart's own coordinates
+        last = positions[-1]
+        clip_id = f"{symbol_id}-part-{number}"
+        clip = UNIT_CLIP.render(clip_id=clip_id, x=last["x"], y=last["y"], width=round(fraction, 3))
+        uses = Markup(uses + UNIT_CLIPPED.render(clip_id=clip_id, use=UNIT_USE.render(**last)))
+    
+    return UNIT_CHART.render(
+        title=title,
+        cols=cols,
+        rows=rows,
+        max_width=cols * 32,
+        number=number,
+        unit_label=unit_label,
+        symbol_id=symbol_id,
+        icon=icon,
+        clip=clip,
+        uses=uses,
+        description=description,
+        unit=unit
+    )
+
+def _impact_visualization_html(number, icon="👧", title="Children Affected", description="",
+                               unit_chart=False, unit_label="children"):
+    """HTML for one icon-based impact visualization."""
+    if unit_chart:
+        return _unit_chart_html(number, icon, title, description, unit_label)
+    
     # Limit the number of icons to display
     display_count = min(number, 100)
     
-    # Calculate how many icons to show
-    icons_html = icon * display_count
-    
-    st.markdown(f"""
-    <div style="text-align: center; margin: 20px 0; background-color: #f8f9fa; padding: 20px; border-radius: 10px;">
-        <h3>{title}</h3>
-        <div style="font-size: 1.2rem; letter-spacing: 5px; line-height: 1.5; margin: 15px 0;">
-            {icons_html}
-        </div>
-        <p><strong>{number:,}</strong> {description}</p>
-    </div>
-    """, unsafe_allow_html=True)
\ No newline at end of file
+    return IMPACT_VISUALIZATION.render(
+        title=title,
+        icons=icon * display_count,
+        number=number,
+        description=description
+    )
+
+def create_impact_visualization(number, icon="👧", title="Children Affected", description="",
+                                unit_chart=False, unit_label="children"):
+    """
+    Create a visual representation of impact using icons.
+    With unit_chart=True each icon stands for a round number of unit_label,
+    so the icons stay proportional to number at any magnitude.
+    """
+    st.markdown(
+        _impact_visualization_html(number, icon, title, description, unit_chart, unit_label),
+        unsafe_allow_html=True
+    )
+
+def create_impact_grid(impacts, columns=3):
+    """
+    Display several impact visualizations as a single element.
+    impacts is a list of dicts with the create_impact_visualization arguments.
+    """
+    items = Markup("".join([_impact_visualization_html(**impact) for impact in impacts]))
+    st.markdown(GRID.render(columns=columns, items=items), unsafe_allow_html=True)
@@ -0,0 +1,250 @@
+import pandas as pd
+import numpy as np
+import math
+import copy
+
+# Vega-Lite aggregate ops that map directly onto pandas groupby reductions
+AGGREGATE_OPS = {
+    "count": "size",
+    "valid": "count",
+    "sum": "sum",
+    "mean": "mean",
+    "average": "mean",
+    "median": "median",
+    "min": "min",
+    "max": "max",
+    "distinct": "nunique",
+    "stdev": "std",
+    "variance": "var",
+    "q1": lambda s: s.quantile(0.25),
+    "q3": lambda s: s.quantile(0.75),
+}
+
+# Channels that hold a second position and never define groups on their own
+SECONDARY_CHANNELS = {"x2", "y2", "theta2", "radius2", "latitude2", "longitude2"}
+
+class Unsupported(Exception):
+    """Raised when a spec uses something the engine cannot evaluate."""
+
+def bin_extent(values, maxbins=10, step=None, nice=True, base=10, divide=(5, 2), minstep=0):
+    """Compute (start, stop, step) the way Vega's bin transform does."""
+    lo, hi = float(np.nanmin(values)), float(np.nanmax(values))
+    span = (hi - lo) or abs(lo) or 1.0
+    log_base = math.log(base)
+
+    if step is None:
+        level = math.ceil(math.log(maxbins) / log_base)
+        step = max(minstep, base ** (round(math.log(span) / log_base) - level))
+        while math.ceil(span / step) > maxbins:
+            step *= base
+        for div in divide:
+            candidate = step / div
+            if candidate >= minstep and span / candidate <= maxbins:
+                step = candidate
+
+    if nice:
+        v = math.log(step)
+        precision = 0 if v >= 0 else int(-v / log_base) + 1
+        eps = base ** (-precision - 1)
+        v = math.floor(lo / step + eps) * step
+        lo = v - step if lo < v else v
+        hi = math.ceil(hi / step) * step
+
+    return lo, (hi if hi > lo else lo + step), step
+
+def _bin_field(frame, field, params, output=None):
+    """Add start and end columns for a binned field; return their names and step."""
+    params = params if isinstance(params, dict) else {}
+    if "extent" in params:
+        values = params["extent"]
+    else:
+        values = frame[field].to_numpy(dtype=float)
+    start, stop, step = bin_extent(
+        values,
+        maxbins=params.get("maxbins", 10),
+        step=params.get("step"),
+        nice=params.get("nice", True)
+    )
+    start_col, end_col = output or (f"bin_{field}", f"bin_{field}_end")
+    index = np.floor((frame[field].to_numpy(dtype=float) - start) / step)
+    # The maximum value belongs to the last bin, as in Vega
+    index = np.minimum(index, math.ceil((stop - start) / step) - 1)
+    frame[start_col] = start + index * step
+    frame[end_col] = frame[start_col] + step
+    return start_col, end_col, step
+
+def _aggregate(frame, groupby, measures):
+    """Group by fields and apply (op, field, output) measures."""
+    groupby = list(dict.fromkeys(groupby))
+    grouped = frame.groupby(groupby, sort=False, dropna=False) if groupby else None
+    columns = {}
+    for op, field, output in measures:
+        if op not in AGGREGATE_OPS:
+            raise Unsupported(f"aggregate op {op}")
+        how = AGGREGATE_OPS[op]
+        if grouped is None:
+            series = frame[field] if field else frame.iloc[:, 0]
+            columns[output] = [len(frame) if how == "size" else series.agg(how)]
+        elif how == "size":
+            columns[output] = grouped.size()
+        else:
+            columns[output] = grouped[field].agg(how)
+    if grouped is None:
+        return pd.DataFrame(columns)
+    return pd.DataFrame(columns).reset_index()
+
+def _stack(frame, field, groupby, sort, offset, output):
+    """Evaluate a Vega-Lite stack transform with a grouped cumulative sum."""
+    start_col, end_col = output
+    if sort:
+        frame = frame.sort_values(
+            [s["field"] for s in sort],
+            ascending=[s.get("order", "ascending") == "ascending" for s in sort],
+            kind="mergesort"
+        )
+    values = frame[field].fillna(0)
+    keys = [frame[g] for g in groupby] if groupby else np.zeros(len(frame))
+    end = values.groupby(keys).cumsum()
+    start = end - values
+    if offset in ("normalize", "center"):
+        total = values.groupby(keys).transform("sum")
+        if offset == "normalize":
+            safe = total.where(total != 0, 1)
+            start, end = start / safe, end / safe
+        else:
+            start, end = start - total / 2, end - total / 2
+    frame = frame.copy()
+    frame[start_col] = start
+    frame[end_col] = end
+    return frame.sort_index()
+
+def _apply_transform(frame, transform):
+    """Evaluate one spec-level transform or raise Unsupported."""
+    if "aggregate" in transform:
+        measures = [(a["op"], a.get("field"), a["as"]) for a in transform["aggregate"]]
+        return _aggregate(frame, transform.get("groupby", []), measures)
+    if "joinaggregate" in transform:
+        groupby = transform.get("groupby", [])
+        frame = frame.copy()
+        for a in transform["joinaggregate"]:
+            if a["op"] not in AGGREGATE_OPS:
+                raise Unsupported(f"joinaggregate op {a['op']}")
+            how = AGGREGATE_OPS[a["op"]]
+            if how == "size" or not a.get("field"):
+                # Counting rows is a sum over a column of ones
+                how, source = "sum", pd.Series(1, index=frame.index)
+            else:
+                source = frame[a["field"]]
+            if groupby:
+                frame[a["as"]] = source.groupby([frame[g] for g in groupby]).transform(how)
+            else:
+                frame[a["as"]] = source.agg(how)
+        return frame
+    if "bin" in transform:
+        frame = frame.copy()
+        output = transform.get("as")
+        if isinstance(output, str):
+            output = (output, f"{output}_end")
+        _bin_field(frame, transform["field"], transform["bin"], output)
+        return frame
+    if "stack" in transform:
+        output = transform["as"]
+        if isinstance(output, str):
+            output = (output, f"{output}_end")
+        return _stack(frame, transform["stack"], transform.get("groupby", []),
+                      transform.get("sort", []), transform.get("offset", "zero"), output)
+    raise Unsupported(next(iter(transform)))
+
+def _field_defs(encoding):
+    """Yield (channel, field definition) pairs, expanding tooltip lists."""
+    for channel, definition in encoding.items():
+        for item in definition if isinstance(definition, list) else [definition]:
+            if isinstance(item, dict):
+                yield channel, item
+
+def _needs_bin(definition):
+    """True when a field definition asks Vega to bin raw values."""
+    params = definition.get("bin")
+    if not params or params == "binned":
+        return False
+    return not (isinstance(params, dict) and params.get("binned"))
+
+def _encoding_aggregate(frame, encoding):
+    """Evaluate encoding-level bin and aggregate, rewriting the encoding in place."""
+    defs = list(_field_defs(encoding))
+    if not any("aggregate" in d or _needs_bin(d) for _, d in defs):
+        return frame
+    for _, d in defs:
+        if "timeUnit" in d or "field" in d.get("condition", {}) or isinstance(d.get("sort"), dict):
+            raise Unsupported("timeUnit, field conditions or sort by field")
+
+    frame = frame.copy()
+    groupby, measures = [], []
+
+    # Binned channels become start/end columns and pre-binned encodings
+    binned = {}
+    for channel, d in defs:
+        if not _needs_bin(d) or "aggregate" in d:
+            continue
+        field = d["field"]
+        if field not in binned:
+            binned[field] = _bin_field(frame, field, d["bin"])
+        start_col, end_col, step = binned[field]
+        d["field"] = start_col
+        d["bin"] = {"binned": True, "step": step}
+        d.setdefault("title", f"{field} (binned)")
+        if channel in ("x", "y") and f"{channel}2" not in encoding:
+            encoding[f"{channel}2"] = {"field": end_col}
+        groupby += [start_col, end_col]
+
+    for channel, d in defs:
+        if "aggregate" in d:
+            op, field = d.pop("aggregate"), d.get("field")
+            output = f"{op}_{field}" if field else "__count"
+            if (op, field, output) not in measures:
+                measures.append((op, field, output))
+            d["field"] = output
+            d.setdefault("title", f"{op.capitalize()} of {field}" if field else "Count of Records")
+            if d.get("type") in (None, "nominal", "ordinal"):
+                d["type"] = "quantitative"
+        elif "field" in d and channel not in SECONDARY_CHANNELS and d["field"] not in groupby:
+            groupby.append(d["field"])
+
+    return _aggregate(frame, groupby, measures)
+
+def pretransform(chart):
+    """
+    Evaluate a chart's aggregate, bin and stack transforms on the server.
+    Supports single-view charts with DataFrame data: leading spec transforms
+    of those kinds plus encoding-level aggregates and bins are computed with
+    pandas, and only the aggregated rows are embedded. Anything the engine
+    cannot evaluate is left for Vega, and unsupported charts come back unchanged.
+    """
+    frame = chart.data
+    if not isinstance(frame, pd.DataFrame) or not hasattr(chart, "mark"):
+        return chart
+
+    # Field types come from a one-row probe so the full data is never serialized
+    probe = chart.copy()
+    probe.data = frame.head(1)
+    spec = probe.to_dict()
+    spec.pop("datasets", None)
+    spec.pop("data", None)
+
+    transforms = spec.pop("transform", [])
+    try:
+        while transforms:
+            frame = _apply_transform(frame, transforms[0])
+            transforms = transforms[1:]
+        encoding = copy.deepcopy(spec.get("encoding", {}))
+        frame = _encoding_aggregate(frame, encoding)
+        spec["encoding"] = encoding
+    except Unsupported:
+        # Keep what was evaluated and leave the rest of the pipeline to Vega
+        pass
+    if transforms:
+        spec["transform"] = transforms
+
+    result = type(chart).from_dict(spec, validate=False)
+    result.data = frame.reset_index(drop=True)
+    return result
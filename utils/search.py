@@ -0,0 +1,255 @@
+import streamlit as st
+import numpy as np
+import math
+import re
+import heapq
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from data.data_loader import get_resources, get_resources_version
+from utils.geo import PointIndex
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from in into is it of on or that the their this to with
+""".split())
+
+# Name matches count more than description matches
+RESOURCE_FIELDS = {"name": 2.0, "description": 1.0, "type": 0.5}
+
+# Facet extractors return one value, a list of values, or None when a resource has none
+RESOURCE_FACETS = {
+    "type": lambda doc: doc.get("type") or None,
+    "category": lambda doc: doc.get("category"),
+    "state": lambda doc: doc.get("state") or None,
+    "language": lambda doc: doc.get("languages") or None,
+    "phone": lambda doc: "Has phone number" if doc.get("phone") else "No phone number",
+}
+
+def tokenize(text):
+    """Lowercase word tokens of a string, without stopwords."""
+    return [t for t in TOKEN_PATTERN.findall(str(text).lower()) if t not in STOPWORDS]
+
+def stem(word):
+    """
+    Light suffix-stripping stemmer: plurals, then one common suffix, then a
+    final e. It only needs to map inflections of a word to the same key, so
+    stems need not be real words (e.g. "abused" and "abuses" both give "abus").
+    """
+    if len(word) <= 3:
+        return word
+    if word.endswith("ies"):
+        word = word[:-3] + "y"
+    elif word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+    for suffix in ("ion", "ing", "ment", "ness", "ed", "er", "ly"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            break
+    if word.endswith("e") and len(word) > 4:
+        word = word[:-1]
+    return word
+
+class SearchIndex:
+    """
+    Inverted index with BM25 ranking over a list of document dicts.
+    Each field's term counts are weighted by fields, and BM25 contributions
+    are computed per (term, document) when the index is built, so a query
+    only looks up postings and adds scores. Every query term must match;
+    the last term also matches as a prefix of indexed words while typing.
+    """
+
+    def __init__(self, documents, fields=None, k1=1.2, b=0.75):
+        self.documents = documents
+        fields = fields or RESOURCE_FIELDS
+        counts = []
+        for doc in documents:
+            tf = Counter()
+            for field, weight in fields.items():
+                for token in tokenize(doc.get(field) or ""):
+                    tf[stem(token)] += weight
+            counts.append(tf)
+
+        lengths = [sum(tf.values()) for tf in counts]
+        avg_length = (sum(lengths) / len(lengths)) if lengths else 1.0
+        df = Counter(term for tf in counts for term in tf)
+        n = len(documents)
+
+        self.postings = defaultdict(dict)
+        for doc_id, tf in enumerate(counts):
+            norm = k1 * (1 - b + b * lengths[doc_id] / avg_length)
+            for term, freq in tf.items():
+                idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+                self.postings[term][doc_id] = idf * freq * (k1 + 1) / (freq + norm)
+
+        # Surface words in sorted order map prefixes to stems with a binary search
+        surface = {}
+        for doc in documents:
+            for field in fields:
+                for token in tokenize(doc.get(field) or ""):
+                    surface.setdefault(token, stem(token))
+        self.words = sorted(surface)
+        self.word_stems = [surface[w] for w in self.words]
+
+    def _prefix_stems(self, prefix):
+        """Stems of every indexed word starting with prefix."""
+        stems = set()
+        i = bisect_left(self.words, prefix)
+        while i < len(self.words) and self.words[i].startswith(prefix):
+            stems.add(self.word_stems[i])
+            i += 1
+        return stems
+
+    def _term_scores(self, token, prefix):
+        """Best score per document for one query token and, optionally, its prefix expansions."""
+        terms = {stem(token)}
+        if prefix and len(token) >= 2:
+            terms |= self._prefix_stems(token)
+        if len(terms) == 1:
+            # A single term's postings already are its scores; callers never modify them
+            return self.postings.get(terms.pop(), {})
+        scores = {}
+        for term in terms:
+            for doc_id, score in self.postings.get(term, {}).items():
+                if score > scores.get(doc_id, 0.0):
+                    scores[doc_id] = score
+        return scores
+
+    def search(self, query, limit=None):
+        """
+        Return ids of documents matching every query term, best first.
+        The last term is treated as a prefix unless the query ends in whitespace.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        prefix_last = not query[-1:].isspace()
+
+        totals = None
+        # Rarest terms first keeps the candidate set small
+        per_token = [self._term_scores(t, prefix_last and i == len(tokens) - 1) for i, t in enumerate(tokens)]
+        for scores in sorted(per_token, key=len):
+            if totals is None:
+                totals = dict(scores)
+            else:
+                totals = {d: s + scores[d] for d, s in totals.items() if d in scores}
+            if not totals:
+                return []
+
+        key = lambda d: (-totals[d], d)
+        if limit:
+            return heapq.nsmallest(limit, totals, key=key)
+        return sorted(totals, key=key)
+
+def popcount(bits):
+    """Number of set bits in an int."""
+    return bits.bit_count() if hasattr(bits, "bit_count") else bin(bits).count("1")
+
+class FacetIndex:
+    """
+    Bitmap indexes over document facets.
+    Every facet value maps to an int whose bit i is set when document i has
+    that value, so a combined filter is a few bitwise ANDs and the count for
+    a value is a popcount, with no pass over the documents. Values selected
+    within one facet are ORed; selections across facets are ANDed.
+    """
+
+    def __init__(self, documents, facets=None):
+        self.size = len(documents)
+        self.all = (1 << self.size) - 1
+        self.bitmaps = {}
+        for facet, extract in (facets or RESOURCE_FACETS).items():
+            positions = defaultdict(list)
+            for i, doc in enumerate(documents):
+                values = extract(doc)
+                if values is None:
+                    continue
+                for value in values if isinstance(values, (list, tuple, set)) else [values]:
+                    positions[value].append(i)
+            self.bitmaps[facet] = {value: self.from_ids(ids) for value, ids in positions.items()}
+
+    def from_ids(self, ids):
+        """Bitmap with the bits of the given document ids set."""
+        flags = np.zeros(self.size, dtype=bool)
+        flags[np.asarray(list(ids), dtype=int)] = True
+        return int.from_bytes(np.packbits(flags, bitorder="little").tobytes(), "little")
+
+    def flags(self, bits):
+        """Boolean array with one entry per document, for O(1) membership tests."""
+        raw = np.frombuffer(bits.to_bytes((self.size + 7) // 8, "little"), dtype=np.uint8)
+        return np.unpackbits(raw, bitorder="little", count=self.size).astype(bool)
+
+    def ids(self, bits):
+        """Document ids whose bits are set, in ascending order."""
+        return np.flatnonzero(self.flags(bits)).tolist()
+
+    def select(self, ids, bits):
+        """The ids, in their given order (e.g. ranked), whose bits are set."""
+        flags = self.flags(bits)
+        return [i for i in ids if flags[i]]
+
+    def mask(self, selection, exclude=None):
+        """
+        Bitmap of documents matching selection, a dict of facet to a value or
+        a collection of values. Empty selections and the exclude facet are
+        ignored, which gives the base for that facet's own counts.
+        """
+        bits = self.all
+        for facet, values in selection.items():
+            if facet == exclude or values is None or values == []:
+                continue
+            if not isinstance(values, (list, tuple, set)):
+                values = [values]
+            facet_bits = 0
+            for value in values:
+                facet_bits |= self.bitmaps[facet].get(value, 0)
+            bits &= facet_bits
+        return bits
+
+    def counts(self, facet, bits):
+        """Number of documents within bits for every value of a facet."""
+        return {value: popcount(value_bits & bits) for value, value_bits in self.bitmaps[facet].items()}
+
+def flatten_resources(resources):
+    """List every resource once, tagged with the category it is listed under."""
+    return [
+        dict(resource, category=category)
+        for category, items in resources.items()
+        for resource in items
+    ]
+
+@st.cache_resource(show_spinner=False)
+def _build_resource_index(version, _resources):
+    return SearchIndex(flatten_resources(_resources))
+
+def get_resource_index():
+    """
+    The SearchIndex over get_resources(), built once per dataset version.
+    The version is a content hash, so editing the resource data rebuilds it.
+    """
+    return _build_resource_index(get_resources_version(), get_resources())
+
+@st.cache_resource(show_spinner=False)
+def _build_resource_facets(version, _documents):
+    return FacetIndex(_documents)
+
+def get_resource_facets():
+    """FacetIndex over the search index's documents, built once per dataset version."""
+    return _build_resource_facets(get_resources_version(), get_resource_index().documents)
+
+@st.cache_resource(show_spinner=False)
+def _build_resource_point_index(version, _documents):
+    located = [i for i, doc in enumerate(_documents) if "latitude" in doc and "longitude" in doc]
+    return PointIndex(
+        [_documents[i]["latitude"] for i in located],
+        [_documents[i]["longitude"] for i in located],
+        ids=located
+    )
+
+def get_resource_point_index():
+    """
+    PointIndex over resources that have coordinates, built once per dataset
+    version. Ids are positions in get_resource_index().documents, so spatial
+    results combine directly with search matches and filters.
+    """
+    return _build_resource_point_index(get_resources_version(), get_resource_index().documents)
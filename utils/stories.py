@@ -0,0 +1,259 @@
+import streamlit as st
+import hashlib
+import random
+import re
+from functools import lru_cache
+from data.data_loader import (
+    get_state_data, get_national_trends, get_age_data, get_perpetrator_data, get_dataset_version
+)
+
+# The parts a story picks from uniformly; maltreatment type, age and perpetrator are drawn from the data
+STORY_PARTS = {
+    "profile": [
+        {"name": "Alex", "gender": "male"},
+        {"name": "Emma", "gender": "female"},
+        {"name": "Jayden", "gender": "male"},
+        {"name": "Sophia", "gender": "female"},
+        {"name": "Miguel", "gender": "male"},
+        {"name": "Ava", "gender": "female"},
+        {"name": "Ethan", "gender": "male"},
+        {"name": "Zoe", "gender": "female"}
+    ],
+    "reporter": ["teacher", "neighbor", "doctor", "relative", "coach"],
+    "intervention": [
+        "family support services",
+        "parenting classes",
+        "substance abuse treatment",
+        "mental health counseling",
+        "temporary removal and foster care placement"
+    ],
+    "outcome": [
+        "remained with family with supports in place",
+        "was temporarily placed with relatives",
+        "entered foster care but later reunified with family",
+        "was adopted by a loving family"
+    ]
+}
+
+# Paragraphs are separated by a blank line, as create_story_container expects
+STORY_TEMPLATE = (
+    "{year_text}, {name}, {child} {state_text}, was identified as experiencing {maltreatment}; "
+    "the person responsible was {perpetrator}. A concerned {reporter} noticed warning signs and "
+    "reported the situation to child protective services. After investigation, {intervention} "
+    "was provided to the family. Eventually, {name} {outcome}.\n\n"
+    "This represents just one example of how data translates to real children's lives. "
+    "Each case is unique, but behind every statistic is a child like {name}."
+)
+
+def describe_child(age, gender):
+    """E.g. "an 8-year-old boy" or "an infant girl"."""
+    noun = "boy" if gender == "male" else "girl"
+    age = int(age)
+    if age < 1:
+        return f"an infant {noun}"
+    article = "an" if age in (8, 11, 18) else "a"
+    return f"{article} {age}-year-old {noun}"
+
+def _story_text(template, state, year, profile, age, **chosen):
+    return template.format(
+        year_text=f"In {year}" if year else "In recent years",
+        state_text=f"in {state}" if state else "in one state",
+        name=profile["name"],
+        child=describe_child(age, profile["gender"]),
+        **chosen
+    )
+
+class StoryBank:
+    """
+    Every combination of the uniformly picked story parts, addressed by an
+    index. An index is a mixed-radix number with one digit per part list,
+    so any combination can be decoded, counted or enumerated without
+    storing it, and one uniform draw picks all the parts at once.
+    """
+
+    def __init__(self, parts=None):
+        self.parts = parts or STORY_PARTS
+        self.size = 1
+        for options in self.parts.values():
+            self.size *= len(options)
+
+    def __len__(self):
+        return self.size
+
+    def choices(self, index):
+        """The part chosen from each list for a combination index."""
+        chosen = {}
+        for name, options in self.parts.items():
+            index, digit = divmod(index, len(options))
+            chosen[name] = options[digit]
+        return chosen
+
+    def draw(self, rng=random):
+        """The parts of a uniformly drawn combination."""
+        return self.choices(int(rng.random() * self.size))
+
+# Maltreatment types with their columns in the state and national trend data
+STATE_TYPE_COLUMNS = {"neglect": "Neglect_Percent", "physical abuse": "Physical_Percent", "sexual abuse": "Sexual_Percent"}
+TREND_TYPE_COLUMNS = {
+    "neglect": "Neglect_Percent",
+    "physical abuse": "Physical_Abuse_Percent",
+    "sexual abuse": "Sexual_Abuse_Percent"
+}
+# How each perpetrator relationship reads in a story; None leaves it out and the rest are renormalized
+PERPETRATOR_PHRASES = {
+    "Parents": "a parent",
+    "Relatives": "a relative",
+    "Partner of Parent": "a parent's partner",
+    "Other": "someone outside the family",
+    "Unknown/Missing": None
+}
+
+class AliasTable:
+    """
+    Walker/Vose alias table for drawing from a discrete distribution.
+    Building it is O(n); each draw is one uniform index and one biased
+    coin flip, O(1) whatever the number of outcomes.
+    """
+
+    def __init__(self, outcomes, weights):
+        n = len(outcomes)
+        total = float(sum(weights))
+        if n == 0 or total <= 0:
+            raise ValueError("An alias table needs at least one positive weight")
+        self.outcomes = list(outcomes)
+        self.probability = [1.0] * n
+        self.alias = list(range(n))
+
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        self.weights = [w / total for w in weights]
+
+    def distribution(self):
+        """(outcome, probability) pairs for the outcomes with a positive weight."""
+        return [(o, w) for o, w in zip(self.outcomes, self.weights) if w > 0]
+
+    def draw(self, rng=random):
+        i = int(rng.random() * len(self.outcomes))
+        return self.outcomes[i if rng.random() < self.probability[i] else self.alias[i]]
+
+def _age_range(group):
+    """Single years of age covered by an age group label such as "1-3 years" or "<1 year"."""
+    bounds = re.match(r"\s*(\d+)\s*-\s*(\d+)", group)
+    if bounds:
+        return range(int(bounds.group(1)), int(bounds.group(2)) + 1)
+    return range(0, 1)
+
+class StoryEngine:
+    """
+    Stories whose details follow the data. Maltreatment type comes from
+    the state's case mix when a known state is given, else from the
+    national mix for the year (or the latest year); the child's age from
+    victim rates by age, spread evenly over the years in each group; and
+    the person responsible from the perpetrator relationships. Every
+    distribution is an AliasTable built once, and the remaining parts are
+    one draw from a StoryBank, so a story costs a few O(1) draws and a
+    format. The same seed, state and year give the same story, and
+    all_stories lists every story with its probability.
+    """
+
+    def __init__(self, state_df, trends_df, age_df, perpetrator_df, parts=None, template=STORY_TEMPLATE, cache_size=1024):
+        self.bank = StoryBank(parts)
+        self.template = template
+
+        types = list(STATE_TYPE_COLUMNS)
+        self.state_types = {
+            row["State"]: AliasTable(types, [row[c] for c in STATE_TYPE_COLUMNS.values()])
+            for row in state_df.to_dict("records")
+        }
+        self.year_types = {
+            int(row["Year"]): AliasTable(types, [row[c] for c in TREND_TYPE_COLUMNS.values()])
+            for row in trends_df.to_dict("records")
+        }
+        self.latest_year = max(self.year_types)
+
+        # Each single year of age is weighted by its group's victim rate per 1,000 children
+        ages, weights = [], []
+        for group, rate in zip(age_df["Age_Group"], age_df["Victim_Rate"]):
+            for age in _age_range(group):
+                ages.append(age)
+                weights.append(rate)
+        self.ages = AliasTable(ages, weights)
+
+        known = [(PERPETRATOR_PHRASES.get(r), p) for r, p in zip(perpetrator_df["Relationship"], perpetrator_df["Percentage"])]
+        known = [(phrase, p) for phrase, p in known if phrase]
+        self.perpetrators = AliasTable([phrase for phrase, _ in known], [p for _, p in known])
+        self.story = lru_cache(maxsize=cache_size)(self._story)
+
+    def types_for(self, state=None, year=None):
+        """The maltreatment type table used for a state and year."""
+        if state in self.state_types:
+            return self.state_types[state]
+        return self.year_types.get(int(year) if year else self.latest_year, self.year_types[self.latest_year])
+
+    def _text(self, state, year, chosen, age, maltreatment, perpetrator):
+        chosen = dict(chosen)
+        profile = chosen.pop("profile")
+        return _story_text(
+            self.template, state, year, profile, age,
+            maltreatment=maltreatment, perpetrator=perpetrator, **chosen
+        )
+
+    def draw(self, rng, state=None, year=None, types=None):
+        """Draw the text of one story with a random.Random."""
+        return self._text(
+            state, year, self.bank.draw(rng), self.ages.draw(rng),
+            (types or self.types_for(state, year)).draw(rng), self.perpetrators.draw(rng)
+        )
+
+    def all_stories(self, state=None, year=None):
+        """
+        Yield (probability, text) for every story the engine can tell for a
+        state and year: each StoryBank combination with each age,
+        maltreatment type and perpetrator the data gives a positive weight.
+        """
+        data_parts = [
+            (p_age * p_type * p_perpetrator, age, maltreatment, perpetrator)
+            for age, p_age in self.ages.distribution()
+            for maltreatment, p_type in self.types_for(state, year).distribution()
+            for perpetrator, p_perpetrator in self.perpetrators.distribution()
+        ]
+        for index in range(len(self.bank)):
+            chosen = self.bank.choices(index)
+            for probability, age, maltreatment, perpetrator in data_parts:
+                yield probability / len(self.bank), self._text(state, year, chosen, age, maltreatment, perpetrator)
+
+    def _story(self, seed, state=None, year=None):
+        key = f"{seed}|{state or ''}|{year or ''}".encode("utf-8")
+        return self.draw(random.Random(hashlib.sha1(key).digest()), state, year)
+
+    def stories(self, count, state=None, year=None, seed=None):
+        """Yield count stories for a state and year from one seeded generator, e.g. for export."""
+        rng = random.Random(seed)
+        types = self.types_for(state, year)
+        for _ in range(count):
+            yield self.draw(rng, state, year, types)
+
+@st.cache_resource(show_spinner=False)
+def _build_story_engine(version):
+    return StoryEngine(get_state_data(), get_national_trends(), get_age_data(), get_perpetrator_data())
+
+def get_story_engine():
+    """The StoryEngine over the current datasets, built once per dataset version."""
+    return _build_story_engine(get_dataset_version())
+
+def story_seed(key):
+    """The story seed stored under a session state key, created on first use."""
+    if key not in st.session_state:
+        st.session_state[key] = random.getrandbits(32)
+    return st.session_state[key]
+
+def new_story(key):
+    """Replace the story seed under a key; use as a button's on_click callback."""
+    st.session_state[key] = random.getrandbits(32)
@@ -0,0 +1,75 @@
+import html
+import re
+from functools import lru_cache
+from string import Formatter
+
+class Markup(str):
+    """A string of trusted HTML that templates insert without escaping."""
+
+    def __html__(self):
+        return self
+
+WHITESPACE = re.compile(r"\s+")
+
+def escape(value):
+    """
+    Escape a value for use in HTML text or attributes; Markup passes through.
+    Whitespace runs collapse to one space, as the browser would render them.
+    Streamlit renders HTML through Markdown, which ends an HTML block at a
+    blank line and shows indented lines after it as code, so a value must
+    never carry line breaks into the output.
+    """
+    if isinstance(value, Markup):
+        return value
+    if hasattr(value, "__html__"):
+        return Markup(value.__html__())
+    return Markup(html.escape(WHITESPACE.sub(" ", str(value)), quote=True))
+
+def _compact(source):
+    """
+    Strip indentation and join the lines of a template source, so empty
+    optional fields cannot leave blank lines behind (see escape).
+    """
+    return "".join(line.strip() for line in source.splitlines())
+
+class Template:
+    """
+    An HTML template with str.format style {field} placeholders.
+    The source is parsed once into literal and field parts. render() applies
+    any format spec (e.g. {value:,}) and escapes every field that is not
+    Markup, so optional sub-fragments are passed in as rendered templates.
+    Fragments are cached by their field values; calls with unhashable
+    values are rendered without the cache, and cache_size=0 disables it.
+    """
+
+    def __init__(self, source, cache_size=1024):
+        self.parts = []
+        for literal, field, spec, conversion in Formatter().parse(_compact(source)):
+            if conversion:
+                raise ValueError(f"Conversions are not supported in templates: {{{field}!{conversion}}}")
+            self.parts.append((literal, field, spec))
+        # Typed, so Markup and an equal plain str never share an entry and skip escaping
+        self._cached_render = lru_cache(maxsize=cache_size, typed=True)(self._render)
+
+    def _render(self, **fields):
+        out = []
+        for literal, field, spec in self.parts:
+            out.append(literal)
+            if field is not None:
+                value = fields[field]
+                out.append(escape(format(value, spec) if spec else value))
+        return Markup("".join(out))
+
+    def render(self, **fields):
+        """Render the template with the given fields and return Markup."""
+        try:
+            hash(tuple(fields.values()))
+        except TypeError:
+            return self._render(**fields)
+        return self._cached_render(**fields)
+
+def render_list(template, items):
+    """Render a template once per dict of fields and join the results in one pass."""
+    return Markup("".join([template.render(**item) for item in items]))
+
+EMPTY = Markup("")